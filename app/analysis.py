@@ -0,0 +1,127 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.keywords import vocab_version
+from app.utils import content_hash, extract_keywords, normalize_text
+
+# Job columns written by analyze_description
+ANALYSIS_COLUMNS = ("normalized_text", "keywords_csv", "analysis_version")
+
+
+def analyze_description(description: Optional[str]) -> Dict:
+    """
+    Text analysis that scoring and tailoring need from a job description.
+    Computed once at ingest and stored on the Job row; recomputed only when
+    the description or the keyword vocabulary changes.
+    """
+    norm = normalize_text(description or "").lower()
+    return {
+        "normalized_text": norm,
+        "keywords_csv": ",".join(extract_keywords(norm)),
+        "analysis_version": vocab_version(),
+    }
+
+
+def split_keywords(keywords_csv: Optional[str]) -> List[str]:
+    return [k for k in (keywords_csv or "").split(",") if k]
+
+
+def is_current(row) -> bool:
+    """True if the stored analysis on a Job (or a row with the same columns) is usable."""
+    return row.normalized_text is not None and row.analysis_version == vocab_version()
+
+
+def job_analysis(db: Session, job: models.Job) -> Tuple[str, List[str]]:
+    """
+    (normalized_text, keywords) for a job, from the stored analysis when it is
+    current, otherwise recomputed and written back to the row (caller commits).
+    """
+    if not is_current(job):
+        for k, v in analyze_description(job.description).items():
+            setattr(job, k, v)
+        db.flush()
+    return job.normalized_text, split_keywords(job.keywords_csv)
+
+
+class JobAnalysis:
+    """
+    Everything scoring, tailoring and the rewriter read from one job
+    description, built once per process (see get_analysis):
+
+      normalized_text  normalized + lowercased description
+      keywords         vocabulary keywords, in order of first appearance
+      keyword_set      the same, for membership tests
+      fuzzy_text       the text's distinct tokens, sorted and joined: the
+                       rapidfuzz input. token_set_ratio only looks at the token
+                       set, so it scores the same as normalized_text and is a
+                       fraction of its length to preprocess.
+    """
+    __slots__ = ("normalized_text", "keywords", "keyword_set", "fuzzy_text")
+
+    def __init__(self, normalized_text: str, keywords: List[str]):
+        self.normalized_text = normalized_text
+        self.keywords = list(keywords)
+        self.keyword_set = frozenset(self.keywords)
+        self.fuzzy_text = " ".join(sorted(set(normalized_text.split())))
+
+
+# (job id or None, sha1 of description, vocab version) -> JobAnalysis
+_cache: "OrderedDict[Tuple, JobAnalysis]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_analysis(
+    job_id: Optional[int],
+    description_hash: str,
+    build: Callable[[], Tuple[str, List[str]]],
+) -> JobAnalysis:
+    """
+    The JobAnalysis for a job from the in-process LRU cache (ANALYSIS_CACHE_SIZE
+    entries), calling `build` for (normalized_text, keywords) on a miss. The key
+    includes the description hash and vocabulary version, so an edited posting
+    or a new vocabulary never gets a stale entry.
+    """
+    key = (job_id, description_hash, vocab_version())
+    with _cache_lock:
+        a = _cache.get(key)
+        if a is not None:
+            _cache.move_to_end(key)
+            return a
+    a = JobAnalysis(*build())
+    with _cache_lock:
+        _cache[key] = a
+        while len(_cache) > max(0, settings.analysis_cache_size):
+            _cache.popitem(last=False)
+    return a
+
+
+def _analyzed(description: Optional[str]) -> Tuple[str, List[str]]:
+    a = analyze_description(description)
+    return a["normalized_text"], split_keywords(a["keywords_csv"])
+
+
+def analyze_job(job: Dict) -> JobAnalysis:
+    """
+    JobAnalysis for a job dict (see packets.job_to_dict), from the analysis it
+    carries ("normalized_text", "keywords") when present.
+    """
+    jh = job.get("content_hash") or content_hash(job.get("description") or "")
+
+    def build():
+        if job.get("normalized_text") is not None and job.get("keywords") is not None:
+            return job["normalized_text"], job["keywords"]
+        return _analyzed(job.get("description"))
+
+    return get_analysis(job.get("id"), jh, build)
+
+
+def analyze_text(jd: Union[str, JobAnalysis]) -> JobAnalysis:
+    """JobAnalysis for a raw description (cached by content), or `jd` itself if already analyzed."""
+    if isinstance(jd, JobAnalysis):
+        return jd
+    return get_analysis(None, content_hash(jd or ""), lambda: _analyzed(jd))
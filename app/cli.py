@@ -0,0 +1,219 @@
+"""
+Headless entry point for cron: the refresh -> score -> packets pipeline, run
+straight against the database and file system with no server.
+
+    python -m app.cli pipeline --top 50
+    python -m app.cli pipeline --csv linkedin.csv --profile 2 --top 20 --due-only
+    python -m app.cli refresh | import FILE.csv | score | packets --top 50
+
+Each stage uses the same worker pools as the API (FETCH_WORKERS threads for
+board fetches, SCORE_WORKERS for the similarity matrix, a process pool of
+PACKET_WORKERS for packets) and the same incremental state, so a rerun only
+does new work: boards answering 304 or an unchanged body are not re-ingested,
+only stale (job, profile) scores are recomputed, and packets whose inputs are
+unchanged are returned from the packet cache.
+
+Progress goes to stderr; the exit status is 1 if any board fetch or packet failed.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from app import models, packets
+from app.config import settings
+from app.db import SessionLocal, engine
+from app.migrations import run_migrations
+from app.ingest import import_jobs_stream
+from app.packets import base_resume_path, generate_packets, job_to_dict, profile_to_dict
+from app.ranking import refresh_scores_many, top_scored_jobs
+from app.refresh import FETCHED, claim_targets, refresh_targets, release_targets, targets_due
+
+
+class Progress:
+    """`stage: done/total` on stderr: redrawn in place on a terminal, every ~10% otherwise."""
+
+    def __init__(self, stage: str, total: int):
+        self.stage, self.total, self.done = stage, total, 0
+        self.t0 = time.perf_counter()
+        self.tty = sys.stderr.isatty()
+        self._next = 0
+
+    def step(self, note: str = "") -> None:
+        self.done += 1
+        if self.tty:
+            print(f"\r{self.stage}: {self.done}/{self.total} {note[:60]:<60}", end="", file=sys.stderr, flush=True)
+        elif self.done >= self._next or self.done == self.total:
+            print(f"{self.stage}: {self.done}/{self.total}", file=sys.stderr, flush=True)
+            self._next = self.done + max(1, self.total // 10)
+
+    def finish(self, summary: str) -> None:
+        if self.tty and self.done:
+            print(file=sys.stderr)
+        print(f"{self.stage}: {summary} ({time.perf_counter() - self.t0:.1f}s)", file=sys.stderr, flush=True)
+
+
+def _log(msg: str) -> None:
+    print(msg, file=sys.stderr, flush=True)
+
+
+def run_refresh(db, force: bool = False, due_only: bool = False) -> int:
+    """Refresh targets (all, or only those due). Returns the number of failed fetches."""
+    targets = targets_due(db) if due_only else db.query(models.Target).order_by(models.Target.id).all()
+    if not targets:
+        _log("refresh: no targets")
+        return 0
+    # targets a running API refresh holds are skipped, not fetched twice
+    claimed = claim_targets(db, [t.id for t in targets])
+    busy = len(targets) - len(claimed)
+    targets = [t for t in targets if t.id in claimed]
+    progress = Progress("refresh", len(targets))
+    try:
+        out = refresh_targets(
+            db, targets, force=force,
+            on_target=lambda t: progress.step(f"{t.source}:{t.company_token} {t.status}"),
+        )
+    finally:
+        release_targets(db, claimed)
+    failed = [t for t in out.targets if t.status not in FETCHED]
+    progress.finish(
+        f"{len(targets)} targets, {busy} busy, {out.inserted} new, {out.updated} updated, "
+        f"{sum(t.deactivated for t in out.targets)} closed, {len(failed)} failed"
+    )
+    for t in failed:
+        _log(f"  {t.source}:{t.company_token} {t.status}: {t.error}")
+    return len(failed)
+
+
+def run_import(db, paths: List[str]) -> None:
+    for path in paths:
+        t0 = time.perf_counter()
+        with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            stats = import_jobs_stream(db, f)
+        _log(
+            f"import {path}: {stats['inserted']} new, {stats['updated']} updated, "
+            f"{stats['skipped']} unchanged, {stats['rejected']} rejected ({time.perf_counter() - t0:.1f}s)"
+        )
+        for e in stats["errors"][:10]:
+            _log(f"  line {e['line']}: {e['error']}")
+
+
+def _profiles(db, ids: Optional[List[int]]) -> List[models.Profile]:
+    q = db.query(models.Profile).order_by(models.Profile.id)
+    if ids:
+        q = q.filter(models.Profile.id.in_(ids))
+    profiles = q.all()
+    missing = sorted(set(ids or []) - {p.id for p in profiles})
+    if missing:
+        raise SystemExit(f"Profile not found: {missing}")
+    if not profiles:
+        raise SystemExit("No profiles. Create one with POST /profile first.")
+    return profiles
+
+
+def run_score(db, profiles: List[models.Profile]) -> None:
+    t0 = time.perf_counter()
+    inputs = {}
+    for p in profiles:
+        prof = profile_to_dict(p)
+        inputs[p.id] = (prof["skills"], prof["truth_bullets"])
+    rescored = refresh_scores_many(db, inputs)
+    db.commit()
+    _log(f"score: {sum(rescored.values())} (job, profile) pairs rescored "
+         f"for {len(profiles)} profiles ({time.perf_counter() - t0:.1f}s)")
+
+
+def run_packets(db, profiles: List[models.Profile], top: int, workers: Optional[int] = None) -> int:
+    """Packets for each profile's `top` jobs. Returns the number that failed."""
+    if not os.path.exists(base_resume_path()):
+        raise SystemExit(f"Missing template: {base_resume_path()}. Put your resume template there.")
+    failed = 0
+    for p in profiles:
+        jobs = [job_to_dict(db, j) for j in top_scored_jobs(db, p.id, top)]
+        db.commit()
+        progress = Progress(f"packets[profile {p.id}]", len(jobs))
+        counts = {"ok": 0, "cached": 0, "failed": 0}
+
+        def on_result(r):
+            outcome = "failed" if not r["ok"] else "cached" if r["packet"]["cached"] else "ok"
+            counts[outcome] += 1
+            progress.step(f"job {r['job_id']} {outcome}")
+
+        results = generate_packets(profile_to_dict(p), jobs, workers=workers, on_result=on_result)
+        progress.finish(f"{counts['ok']} built, {counts['cached']} unchanged, {counts['failed']} failed")
+        for r in results:
+            if not r["ok"]:
+                _log(f"  job {r['job_id']}: {r['error']}")
+        failed += counts["failed"]
+    return failed
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.split("\n\n")[0].strip())
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def refresh_opts(p):
+        p.add_argument("--force", action="store_true", help="ignore stored ETags/body hashes and re-ingest every board")
+        p.add_argument("--due-only", action="store_true", help="only targets whose refresh interval has elapsed")
+        p.add_argument("--fetch-workers", type=int, help="concurrent board fetches (default FETCH_WORKERS)")
+
+    def profile_opts(p):
+        p.add_argument("--profile", type=int, action="append", dest="profiles",
+                       help="profile id (repeatable; default every profile)")
+
+    def packet_opts(p):
+        p.add_argument("--top", type=int, default=50, help="packets for each profile's top N jobs (0 = none)")
+        p.add_argument("--workers", type=int, help="packet processes (default PACKET_WORKERS / cpu count)")
+
+    p = sub.add_parser("pipeline", help="refresh boards, import CSVs, score, build packets")
+    refresh_opts(p)
+    profile_opts(p)
+    packet_opts(p)
+    p.add_argument("--csv", action="append", default=[], help="jobs CSV to import (repeatable)")
+    p.add_argument("--skip-refresh", action="store_true", help="don't fetch boards")
+
+    p = sub.add_parser("refresh", help="refresh job boards")
+    refresh_opts(p)
+
+    p = sub.add_parser("import", help="import jobs CSV files")
+    p.add_argument("paths", nargs="+")
+
+    p = sub.add_parser("score", help="rescore stale (job, profile) pairs")
+    profile_opts(p)
+
+    p = sub.add_parser("packets", help="build packets for each profile's top jobs")
+    profile_opts(p)
+    packet_opts(p)
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if getattr(args, "fetch_workers", None):
+        settings.fetch_workers = args.fetch_workers
+    if getattr(args, "workers", None):
+        settings.packet_workers = args.workers  # sizes the packet pool
+    run_migrations(engine)
+    db = SessionLocal()
+    failed = 0
+    try:
+        if args.command in ("pipeline", "refresh") and not getattr(args, "skip_refresh", False):
+            failed += run_refresh(db, force=args.force, due_only=args.due_only)
+        if args.command == "import":
+            run_import(db, args.paths)
+        if args.command == "pipeline":
+            run_import(db, args.csv)
+        if args.command in ("pipeline", "score", "packets"):
+            profiles = _profiles(db, args.profiles)
+            run_score(db, profiles)
+            if args.command != "score" and args.top > 0:
+                failed += run_packets(db, profiles, args.top, workers=args.workers)
+    finally:
+        db.close()
+        packets.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,79 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_name: str = "Job Apply Assistant"
     db_url: str = "sqlite:///./data/db.sqlite3"
+
+    # Storage tuning (see app/db.py). The pool covers FastAPI's threadpool plus
+    # the fetch/packet workers that hold a connection at the same time.
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_wal: bool = True
+    db_synchronous: str = "NORMAL"
+    db_busy_timeout_ms: int = 10000
+    db_cache_size_kb: int = 65536          # 64 MiB page cache per connection
+    db_mmap_size: int = 268435456          # 256 MiB
+
     packets_dir: str = "./data/packets"
     templates_dir: str = "./data/templates"
+    vocab_path: str = "./data/vocab/skills.txt"
     openai_api_key: str = ""
     openai_model: str = "gpt-4o-mini"
 
+    # rapidfuzz cdist workers for batched scoring (-1 = all cores)
+    score_workers: int = -1
+    # Analyzed job descriptions kept in memory per process (app/analysis.py)
+    analysis_cache_size: int = 512
+
+    # CSV import: rows per upsert/commit and how many row errors to list
+    import_chunk_size: int = 1000
+    import_max_errors: int = 1000
+
+    # Batch packet generation process pool (0 = cpu count), shared by all requests
+    packet_workers: int = 0
+    # Most jobs one POST /packets/generate may build (`top` is clamped to it)
+    packets_batch_max: int = 200
+    # Cached packet versions kept per job folder (older ones are pruned)
+    packet_versions_kept: int = 3
+
+    # Resume PDF upload (app/resume.py): limits, and the process pool that
+    # extracts the pages of longer files in parallel
+    resume_max_bytes: int = 10 * 1024 * 1024
+    resume_max_pages: int = 50
+    resume_parse_workers: int = 0          # 0 = cpu count; 1 = always in the request thread
+
+    # Board fetching (POST /jobs/refresh)
+    fetch_workers: int = 16
+    fetch_timeout: float = 20.0
+    # Board API roots; point at a local stand-in (see bench/boards.py) for benchmarks
+    greenhouse_api_base: str = "https://boards-api.greenhouse.io"
+    lever_api_base: str = "https://api.lever.co"
+
+    # Near-duplicate clustering at ingest (app/dedupe.py): estimated Jaccard
+    # similarity of title/company/description shingles needed to cluster two jobs
+    dedupe_enabled: bool = True
+    dedupe_threshold: float = 0.8
+
+    # Board sync: move postings closed for this many days to jobs_archive (0 = keep)
+    archive_closed_after_days: int = 0
+
+    # Background tasks + periodic per-target refresh (app/tasks.py)
+    task_workers: int = 2
+    task_history: int = 500
+    scheduler_enabled: bool = True
+    scheduler_tick_seconds: float = 30.0
+    # How long a refresh's claim on a target lasts if its process dies before
+    # releasing it (claims live in the targets table, shared by all processes)
+    target_claim_minutes: int = 30
+    refresh_interval_minutes: int = 60
+    # A target whose fetch failed is retried after this many minutes, doubling
+    # with each consecutive failure up to the max (instead of on every tick)
+    refresh_retry_minutes: int = 5
+    refresh_retry_max_minutes: int = 1440
+
+    # Observability (app/metrics.py): GET /metrics, and a Server-Timing stage
+    # breakdown on responses to requests that send `X-Profile: 1`
+    profiling_enabled: bool = True
+
     class Config:
         env_file = ".env"
 
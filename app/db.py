@@ -1,15 +1,67 @@
-from sqlalchemy import create_engine
+from typing import Iterable, Optional
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
+from app.metrics import instrument_engine
+
+_is_sqlite = settings.db_url.startswith("sqlite")
+_is_memory = _is_sqlite and (":memory:" in settings.db_url or settings.db_url.rstrip("/") == "sqlite:")
+
+def _engine_kwargs() -> dict:
+    kw = {}
+    if _is_sqlite:
+        # sqlite3's own busy handler: wait for a writer instead of failing with "database is locked"
+        kw["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.db_busy_timeout_ms / 1000.0,
+        }
+    if not _is_memory:
+        # One connection per concurrently running request/worker thread, plus headroom
+        kw["pool_size"] = settings.db_pool_size
+        kw["max_overflow"] = settings.db_max_overflow
+        kw["pool_timeout"] = settings.db_pool_timeout
+        kw["pool_pre_ping"] = not _is_sqlite
+    return kw
 
-engine = create_engine(
-    settings.db_url,
-    connect_args={"check_same_thread": False} if settings.db_url.startswith("sqlite") else {},
-)
+engine = create_engine(settings.db_url, **_engine_kwargs())
+instrument_engine(engine)
+
+if _is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        # Applied to every new pooled connection. WAL lets readers (/jobs/top, search)
+        # run while a refresh or import is writing; NORMAL sync is safe under WAL.
+        cur = dbapi_conn.cursor()
+        if settings.db_wal and not _is_memory:
+            cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute(f"PRAGMA synchronous={settings.db_synchronous}")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.db_busy_timeout_ms)}")
+        cur.execute(f"PRAGMA cache_size={-int(settings.db_cache_size_kb)}")  # negative = KiB
+        cur.execute(f"PRAGMA mmap_size={int(settings.db_mmap_size)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def insert_on_conflict(model, index_elements: Iterable[str], update_cols: Optional[Iterable[str]] = None):
+    """
+    INSERT for bulk writes that tolerates rows another worker wrote concurrently:
+    on a unique-key conflict, update `update_cols` (or do nothing if None).
+    Falls back to a plain INSERT on non-SQLite databases.
+    """
+    if not _is_sqlite:
+        return insert(model)
+    stmt = sqlite_insert(model)
+    if update_cols:
+        return stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={c: stmt.excluded[c] for c in update_cols},
+        )
+    return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,301 @@
+"""
+Near-duplicate postings across sources (the same role from Greenhouse, a
+LinkedIn export and an Indeed export, each under its own url).
+
+Each job gets a MinHash signature of its title, company and description
+shingles, stored on the row. Signatures are split into LSH bands whose hashes
+go into job_lsh, so finding candidates for a new job is an indexed lookup on
+its band hashes instead of a scan. Candidates whose estimated Jaccard
+similarity reaches DEDUPE_THRESHOLD are merged into a cluster (jobs.cluster_id,
+the smallest member id), and one member per cluster is marked canonical; the
+others are left out of scoring and batch packets.
+"""
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app import metrics, models
+from app.config import settings
+from app.db import insert_on_conflict
+
+NUM_PERM = 128
+# 16 bands x 8 rows: pairs become candidates from a Jaccard of about 0.7
+BANDS, ROWS = 16, 8
+SHINGLE = 3
+# shorter texts (e.g. a title without a description) are never clustered
+MIN_SHINGLES = 10
+
+# SQLite's bound-parameter limit is large on modern builds but 999 on older ones
+CHUNK = 900
+
+# Multiply-shift hash family: h_i(x) = (a_i * x + b_i mod 2**64) >> 32, with odd a_i.
+# No modulo, so a signature is a handful of vectorized uint64 ops.
+_rng = np.random.RandomState(20240601)
+_A = (_rng.randint(0, 1 << 62, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+_B = _rng.randint(0, 1 << 62, NUM_PERM, dtype=np.uint64)[:, None]
+_SHIFT = np.uint64(32)
+_GRAM_MUL = np.uint64(0x9E3779B97F4A7C15)
+# per-row multipliers and per-band salts that fold a band's ROWS values into one 64-bit key
+_BAND_MUL = (_rng.randint(0, 1 << 62, ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1))
+_BAND_SALT = _rng.randint(0, 1 << 62, BANDS, dtype=np.uint64)
+
+_WORD_RE = re.compile(rb"[a-z0-9]+")
+_COMPANY_SUFFIXES = {b"inc", b"llc", b"ltd", b"corp", b"corporation", b"co", b"company", b"gmbh", b"plc", b"ag", b"sa"}
+
+# Canonical job preference: active, then ATS boards (they carry the real apply
+# link), then the longest description, then the oldest row.
+SOURCE_RANK = {"greenhouse": 0, "lever": 0, "company": 1}
+
+
+def shingles(title: Optional[str], company: Optional[str], description: Optional[str]) -> np.ndarray:
+    """Distinct hashes of the word SHINGLE-grams, plus one for the normalized company name."""
+    words = _WORD_RE.findall(f"{title or ''} {description or ''}".lower().encode())
+    # hash each word once and combine neighbours, rather than hashing every joined n-gram
+    w = np.array([zlib.crc32(x) for x in words], dtype=np.uint64)
+    n = len(w) - SHINGLE + 1
+    grams = np.zeros(max(n, 0), dtype=np.uint64)
+    for i in range(SHINGLE if n > 0 else 0):
+        grams = grams * _GRAM_MUL + w[i:i + n]  # wraps mod 2**64
+    company_key = b"".join(x for x in _WORD_RE.findall((company or "").lower().encode()) if x not in _COMPANY_SUFFIXES)
+    if company_key:
+        grams = np.append(grams, np.uint64(zlib.crc32(b"company:" + company_key)))
+    return np.unique(grams)
+
+
+def signature(title: Optional[str], company: Optional[str], description: Optional[str]) -> Optional[bytes]:
+    """MinHash signature (NUM_PERM uint32s as bytes), or None if the text is too short."""
+    x = shingles(title, company, description)
+    if len(x) < MIN_SHINGLES:
+        return None
+    h = _A * x  # wraps mod 2**64
+    h += _B
+    # the shift is monotonic, so it can be applied after taking the minimum
+    return (h.min(axis=1) >> _SHIFT).astype(np.uint32).tobytes()
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(np.frombuffer(a, np.uint32) == np.frombuffer(b, np.uint32)))
+
+
+def band_keys(sigs: Sequence[bytes]) -> np.ndarray:
+    """
+    (len(sigs), BANDS) int64 bucket keys. Each band's values are folded into one
+    64-bit hash; the per-band salt keeps equal values in different bands apart.
+    """
+    m = np.frombuffer(b"".join(sigs), np.uint32).reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    keys = (m * _BAND_MUL).sum(axis=2, dtype=np.uint64) + _BAND_SALT
+    return keys.view(np.int64)
+
+
+def _chunks(items: Sequence, n: int = CHUNK):
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+def index_jobs(db: Session, job_ids: Iterable[int], fresh: bool = False) -> int:
+    """
+    (Re)index jobs after they were inserted or their title/description changed:
+    replace their LSH entries, look up candidates by band, and merge the ones
+    similar enough into clusters. A cluster never holds two jobs from the same
+    source, so e.g. one company's per-city postings of a role stay separate.
+    `fresh` says the jobs were just inserted (nothing to detach).
+    Returns how many of the jobs ended up in a cluster.
+
+    Does not commit; the caller owns the transaction.
+    """
+    if not settings.dedupe_enabled:
+        return 0
+    Job, LSH = models.Job, models.JobLSH
+    ids = sorted(set(job_ids))
+    if not ids:
+        return 0
+
+    with metrics.stage("dedupe.index"):
+        rows = []
+        for chunk in _chunks(ids):
+            rows.extend(db.execute(
+                select(Job.id, Job.source, Job.minhash, Job.cluster_id).where(Job.id.in_(chunk))
+            ).all())
+
+        # detach from any previous cluster; re-cluster from scratch below
+        left = {r.cluster_id for r in rows if r.cluster_id is not None}
+        for chunk in ([] if fresh else _chunks(ids)):
+            db.execute(delete(LSH).where(LSH.job_id.in_(chunk)))
+            db.execute(
+                update(Job).where(Job.id.in_(chunk))
+                .values(cluster_id=None, is_canonical=True)
+                .execution_options(synchronize_session=False)
+            )
+        # a cluster is named after its smallest member; rename those that just lost it
+        for cid in sorted(left & set(ids)):
+            left.discard(cid)
+            rest = db.execute(select(func.min(Job.id)).where(Job.cluster_id == cid)).scalar()
+            if rest is not None:
+                db.execute(
+                    update(Job).where(Job.cluster_id == cid).values(cluster_id=rest)
+                    .execution_options(synchronize_session=False)
+                )
+                left.add(rest)
+
+        sigs: Dict[int, bytes] = {r.id: r.minhash for r in rows if r.minhash is not None}
+        source: Dict[int, str] = {r.id: r.source for r in rows}
+        # jobs ingested before dedupe existed (scripts/dedupe_jobs.py) get signed here
+        unsigned = [r.id for r in rows if r.minhash is None]
+        backfill = []
+        for chunk in _chunks(unsigned):
+            for r in db.execute(
+                select(Job.id, Job.title, Job.company, Job.description).where(Job.id.in_(chunk))
+            ):
+                sig = signature(r.title, r.company, r.description)
+                if sig is not None:
+                    sigs[r.id] = sig
+                    backfill.append({"id": r.id, "minhash": sig})
+        if backfill:
+            db.execute(update(Job), backfill)
+
+        signed = list(sigs)
+        keys = dict(zip(signed, band_keys([sigs[j] for j in signed]).tolist())) if signed else {}
+        bucket_jobs: Dict[int, Set[int]] = defaultdict(set)
+        for jid, ks in keys.items():
+            for k in ks:
+                bucket_jobs[k].add(jid)
+        all_keys = list(bucket_jobs)
+        for chunk in _chunks(all_keys):
+            for k, jid in db.execute(select(LSH.bucket, LSH.job_id).where(LSH.bucket.in_(chunk))):
+                bucket_jobs[k].add(jid)
+        lsh_rows = [{"bucket": k, "job_id": jid} for jid, ks in keys.items() for k in ks]
+        if lsh_rows:
+            # Core executemany (no ORM bookkeeping: this is BANDS rows per job). A row a
+            # concurrent import inserted and indexed first is already there.
+            db.connection().execute(insert_on_conflict(LSH.__table__, ["bucket", "job_id"]), lsh_rows)
+
+        candidates: Dict[int, Set[int]] = defaultdict(set)
+        for bucket in bucket_jobs.values():
+            if len(bucket) > 1:
+                for jid in bucket:
+                    if jid in keys:
+                        candidates[jid] |= bucket - {jid}
+        others = sorted({c for cs in candidates.values() for c in cs} - set(keys))
+
+        # current clusters of the existing candidates, with all their members
+        cluster_of: Dict[int, int] = {jid: jid for jid in keys}
+        for chunk in _chunks(others):
+            for r in db.execute(
+                select(Job.id, Job.source, Job.minhash, Job.cluster_id).where(Job.id.in_(chunk))
+            ):
+                if r.minhash is not None:
+                    sigs[r.id] = r.minhash
+                source[r.id] = r.source
+                cluster_of[r.id] = r.cluster_id or r.id
+        existing = sorted({c for c in cluster_of.values()} - set(keys))
+        for chunk in _chunks(existing):
+            for r in db.execute(select(Job.id, Job.source, Job.cluster_id).where(Job.cluster_id.in_(chunk))):
+                if r.id not in keys:
+                    source[r.id] = r.source
+                    cluster_of[r.id] = r.cluster_id
+
+        members: Dict[int, Set[int]] = defaultdict(set)
+        for jid, cid in cluster_of.items():
+            members[cid].add(jid)
+
+        threshold = settings.dedupe_threshold
+        touched: Set[int] = set(left)
+        for jid in sorted(keys):
+            scored = sorted(
+                ((similarity(sigs[jid], sigs[c]), c) for c in candidates.get(jid, ()) if c in sigs),
+                reverse=True,
+            )
+            for sim, c in scored:
+                if sim < threshold:
+                    break
+                a, b = cluster_of[jid], cluster_of[c]
+                if a == b:
+                    continue
+                if {source[m] for m in members[a]} & {source[m] for m in members[b]}:
+                    continue
+                keep, drop = min(a, b), max(a, b)
+                for m in members.pop(drop):
+                    cluster_of[m] = keep
+                    members[keep].add(m)
+                touched.add(keep)
+                touched.discard(drop)
+
+        clustered = 0
+        for cid in touched:
+            group = sorted(members.get(cid, ()))
+            if len(group) < 2:
+                continue
+            clustered += sum(1 for m in group if m in keys)
+            for chunk in _chunks(group):
+                db.execute(
+                    update(Job).where(Job.id.in_(chunk)).values(cluster_id=cid)
+                    .execution_options(synchronize_session=False)
+                )
+        recanonicalize(db, touched)
+    return clustered
+
+
+def recanonicalize(db: Session, cluster_ids: Iterable[int]) -> None:
+    """
+    Pick the canonical job of each cluster (see SOURCE_RANK). A cluster left
+    with a single member is dissolved. Call after members join, leave, or
+    change is_active.
+    """
+    Job = models.Job
+    cids = sorted(set(c for c in cluster_ids if c is not None))
+    groups: Dict[int, list] = defaultdict(list)
+    for chunk in _chunks(cids):
+        for r in db.execute(
+            select(Job.id, Job.source, Job.is_active, func.length(Job.description).label("n"), Job.cluster_id)
+            .where(Job.cluster_id.in_(chunk))
+        ):
+            groups[r.cluster_id].append(r)
+
+    singles, canonical, duplicate = [], [], []
+    for rows in groups.values():
+        if len(rows) < 2:
+            singles.extend(r.id for r in rows)
+            continue
+        best = min(rows, key=lambda r: (
+            r.is_active is False, SOURCE_RANK.get(r.source, 2), -(r.n or 0), r.id,
+        ))
+        canonical.append(best.id)
+        duplicate.extend(r.id for r in rows if r.id != best.id)
+
+    for ids_, values in (
+        (singles, {"cluster_id": None, "is_canonical": True}),
+        (canonical, {"is_canonical": True}),
+        (duplicate, {"is_canonical": False}),
+    ):
+        for chunk in _chunks(ids_):
+            db.execute(
+                update(Job).where(Job.id.in_(chunk)).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+
+
+def canonical_ids(db: Session, job_ids: Iterable[int]) -> Dict[int, int]:
+    """job id -> id of its cluster's canonical job (itself if canonical or unclustered)."""
+    Job = models.Job
+    ids = list(set(job_ids))
+    out: Dict[int, int] = {}
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for chunk in _chunks(ids):
+        for r in db.execute(select(Job.id, Job.cluster_id, Job.is_canonical).where(Job.id.in_(chunk))):
+            out[r.id] = r.id
+            if r.cluster_id is not None and r.is_canonical is False:
+                clusters[r.cluster_id].append(r.id)
+    cids = list(clusters)
+    for chunk in _chunks(cids):
+        for r in db.execute(
+            select(Job.id, Job.cluster_id).where(Job.cluster_id.in_(chunk), Job.is_canonical == True)
+        ):
+            for jid in clusters[r.cluster_id]:
+                out[jid] = r.id
+    return out
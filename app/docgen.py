@@ -1,32 +1,174 @@
 import os
-from typing import Dict
-from docx import Document
+import re
+import copy
+import threading
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from app import metrics
+
+PLACEHOLDER_RE = re.compile(r"\{\{[A-Z0-9_]+\}\}")
+
+# qn("w:p") / qn("w:t"), spelled out so python-docx is only imported on first use
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = _W_NS + "p"
+_W_T = _W_NS + "t"
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+# Child-index path from a part's root element down to a node
+Path = Tuple[int, ...]
+
+
+def _path_to(root, el) -> Path:
+    path = []
+    while el is not root:
+        parent = el.getparent()
+        path.append(parent.index(el))
+        el = parent
+    return tuple(reversed(path))
+
+
+def _follow(root, path: Path):
+    el = root
+    for i in path:
+        el = el[i]
+    return el
+
+
+def _index_placeholders(root) -> List[Tuple[List[Path], bool]]:
+    """
+    Find every paragraph (body, tables, headers, ...) whose text holds a placeholder.
+    Returns one (text_node_paths, spans_runs) slot per paragraph: the w:t nodes to
+    rewrite, and whether a placeholder is split across several of them (Word often
+    splits "{{FULL_NAME}}" into multiple runs).
+    """
+    slots = []
+    for p in root.iter(_W_P):
+        ts = [t for t in p.iter(_W_T)]
+        text = "".join(t.text or "" for t in ts)
+        if not PLACEHOLDER_RE.search(text):
+            continue
+        whole = [t for t in ts if PLACEHOLDER_RE.search(t.text or "")]
+        inside = sum(len(PLACEHOLDER_RE.findall(t.text or "")) for t in whole)
+        if inside == len(PLACEHOLDER_RE.findall(text)):
+            slots.append(([_path_to(root, t) for t in whole], False))
+        else:
+            slots.append(([_path_to(root, t) for t in ts], True))
+    return slots
+
+
+class _Template:
+    """
+    A base DOCX parsed once: the raw bytes, a pristine copy of every part that
+    gets modified, and where the placeholders live inside those parts.
+    """
+
+    def __init__(self, path: str, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        with open(path, "rb") as f:
+            self.data = f.read()
+
+        from docx import Document
+        from docx.opc.part import XmlPart
+
+        doc = Document(BytesIO(self.data))
+        self.pristine: Dict[str, object] = {}
+        self.slots: Dict[str, List[Tuple[List[Path], bool]]] = {}
+        for part in doc.part.package.iter_parts():
+            if not isinstance(part, XmlPart):
+                continue
+            slots = _index_placeholders(part.element)
+            # the main document part is always reset since highlights get appended to it
+            if slots or part is doc.part:
+                name = str(part.partname)
+                self.pristine[name] = copy.deepcopy(part.element)
+                self.slots[name] = slots
+
+
+_templates: Dict[str, _Template] = {}
+_templates_lock = threading.Lock()
+# python-docx objects aren't thread-safe, so each thread renders into its own package
+_local = threading.local()
+
+
+def _get_template(path: str) -> _Template:
+    mtime = os.path.getmtime(path)
+    t = _templates.get(path)
+    if t is None or t.mtime != mtime:
+        with _templates_lock:
+            t = _templates.get(path)
+            if t is None or t.mtime != mtime:
+                t = _Template(path, mtime)
+                _templates[path] = t
+    return t
+
+
+def _working_document(tmpl: _Template):
+    docs = getattr(_local, "docs", None)
+    if docs is None:
+        docs = _local.docs = {}
+    cached: Optional[Tuple[_Template, object]] = docs.get(tmpl.path)
+    if cached is None or cached[0] is not tmpl:
+        from docx import Document
+
+        doc = Document(BytesIO(tmpl.data))
+        parts = {
+            str(p.partname): p
+            for p in doc.part.package.iter_parts()
+            if str(p.partname) in tmpl.pristine
+        }
+        cached = docs[tmpl.path] = (tmpl, (doc, parts))
+    return cached[1]
+
+
+def _fill(root, slots: List[Tuple[List[Path], bool]], replacements: Dict[str, str]) -> None:
+    def sub(s: str) -> str:
+        return PLACEHOLDER_RE.sub(lambda m: replacements.get(m.group(0), m.group(0)), s)
+
+    for paths, spans_runs in slots:
+        ts = [_follow(root, p) for p in paths]
+        if spans_runs:
+            # collapse into the first text node, keeping that run's formatting
+            ts[0].text = sub("".join(t.text or "" for t in ts))
+            for t in ts[1:]:
+                t.text = ""
+        else:
+            for t in ts:
+                t.text = sub(t.text or "")
+        for t in ts:
+            if t.text and t.text != t.text.strip():
+                t.set(_XML_SPACE, "preserve")
 
 
 def generate_resume_docx(base_template_path: str, out_path: str, data: Dict) -> None:
-    doc = Document(base_template_path)
+    with metrics.stage("docgen.template"):
+        tmpl = _get_template(base_template_path)
+        doc, parts = _working_document(tmpl)
 
     replacements = {
-        "{{FULL_NAME}}": data.get("full_name", ""),
-        "{{EMAIL}}": data.get("email", ""),
-        "{{PHONE}}": data.get("phone", ""),
-        "{{LOCATION}}": data.get("location", ""),
-        "{{LINKEDIN}}": data.get("linkedin", ""),
-        "{{SUMMARY}}": data.get("summary", ""),
+        "{{FULL_NAME}}": data.get("full_name", "") or "",
+        "{{EMAIL}}": data.get("email", "") or "",
+        "{{PHONE}}": data.get("phone", "") or "",
+        "{{LOCATION}}": data.get("location", "") or "",
+        "{{LINKEDIN}}": data.get("linkedin", "") or "",
+        "{{SUMMARY}}": data.get("summary", "") or "",
         "{{SKILLS}}": ", ".join(data.get("skills", [])),
     }
 
-    # Replace template placeholders
-    for p in doc.paragraphs:
-        for k, v in replacements.items():
-            if k in p.text:
-                p.text = p.text.replace(k, v)
+    # Reset modified parts from the pristine copies and fill placeholders in one pass
+    with metrics.stage("docgen.fill"):
+        for name, pristine in tmpl.pristine.items():
+            part = parts[name]
+            part._element = copy.deepcopy(pristine)
+            _fill(part._element, tmpl.slots[name], replacements)
+        doc = doc.part.document  # fresh wrapper over the reset document element
 
-    # Insert highlights near the top (ATS-safe)
-    doc.add_paragraph("")  # spacing
-    doc.add_paragraph("TARGETED HIGHLIGHTS")
-    for b in data.get("tailored_highlights", []):
-        doc.add_paragraph(b, style="List Bullet")
+        # Insert highlights near the top (ATS-safe)
+        doc.add_paragraph("")  # spacing
+        doc.add_paragraph("TARGETED HIGHLIGHTS")
+        for b in data.get("tailored_highlights", []):
+            doc.add_paragraph(b, style="List Bullet")
 
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    doc.save(out_path)
\ No newline at end of file
+    with metrics.stage("docgen.save"):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        doc.save(out_path)
@@ -1,25 +1,75 @@
 import csv
 from io import StringIO
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
 
 REQUIRED = ["source","company","title","url"]
 
+def _row_to_job(row: Dict) -> Dict:
+    # DictReader puts surplus cells under the None key; ignore them
+    r = {k.strip(): (v or "").strip() for k, v in row.items() if k is not None and not isinstance(v, list)}
+    for req in REQUIRED:
+        if not r.get(req):
+            raise ValueError(f"Missing required column '{req}' in a row.")
+    return {
+        "source": r.get("source","import"),
+        "company": r.get("company",""),
+        "title": r.get("title",""),
+        "location": r.get("location") or None,
+        "url": r.get("url",""),
+        # None (not "") when empty, so a re-import never blanks a stored description
+        "description": r.get("description") or None,
+        "department": r.get("department") or None,
+    }
+
+def missing_columns(fieldnames: Optional[List[str]]) -> List[str]:
+    have = {(f or "").strip() for f in (fieldnames or [])}
+    return [c for c in REQUIRED if c not in have]
+
+def iter_jobs_csv(stream: TextIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Stream a jobs CSV without loading it into memory.
+
+    Yields (line_number, job_dict, None) for good rows and
+    (line_number, None, error) for rejected ones, so one bad row never aborts
+    the import. line_number is the physical line the record starts on
+    (the header is line 1).
+    """
+    # csv.reader rather than DictReader: DictReader skips blank lines inside
+    # next(), which would hide where the record it returns actually started
+    reader = csv.reader(stream)
+    try:
+        fieldnames = next(reader)
+    except StopIteration:
+        return  # empty file
+    missing = missing_columns(fieldnames)
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    while True:
+        # each next() consumes one record (possibly multi-line) or one blank line
+        line = reader.line_num + 1
+        try:
+            cells = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield line, None, f"Malformed CSV: {e}"
+            continue
+        if not cells:
+            continue  # blank line
+        # same shape as a DictReader row: short rows padded with None, surplus cells under None
+        row = dict(zip(fieldnames, cells + [None] * (len(fieldnames) - len(cells))))
+        if len(cells) > len(fieldnames):
+            row[None] = cells[len(fieldnames):]
+        try:
+            yield line, _row_to_job(row), None
+        except ValueError as e:
+            yield line, None, str(e)
+
 def parse_jobs_csv(csv_text: str) -> List[Dict]:
-    f = StringIO(csv_text)
-    reader = csv.DictReader(f)
     rows = []
-    for row in reader:
-        r = {k.strip(): (v or "").strip() for k, v in row.items()}
-        for req in REQUIRED:
-            if not r.get(req):
-                raise ValueError(f"Missing required column '{req}' in a row.")
-        rows.append({
-            "source": r.get("source","import"),
-            "company": r.get("company",""),
-            "title": r.get("title",""),
-            "location": r.get("location") or None,
-            "url": r.get("url",""),
-            "description": r.get("description") or "",
-            "department": r.get("department") or None,
-        })
+    for _, job, err in iter_jobs_csv(StringIO(csv_text)):
+        if err:
+            raise ValueError(err)
+        rows.append(job)
     return rows
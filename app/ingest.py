@@ -0,0 +1,249 @@
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set, TextIO
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import metrics, models
+from app.db import insert_on_conflict
+from app.analysis import analyze_description
+from app.config import settings
+from app.importers.csv_import import iter_jobs_csv
+from app.utils import content_hash, utcnow
+
+# SQLite's bound-parameter limit is large on modern builds but 999 on older ones
+LOOKUP_CHUNK = 900
+
+# Columns refreshed on an existing row when the incoming value differs.
+# None means "source didn't provide it" and never overwrites stored data.
+UPDATABLE = ("title", "location", "description")
+
+JOB_COLUMNS = ("source", "company", "title", "location", "url", "description", "department")
+
+
+def _existing_by_url(db: Session, urls: List[str]) -> Dict[str, Dict]:
+    found: Dict[str, Dict] = {}
+    cols = [models.Job.id, models.Job.url] + [getattr(models.Job, c) for c in UPDATABLE]
+    for i in range(0, len(urls), LOOKUP_CHUNK):
+        chunk = urls[i:i + LOOKUP_CHUNK]
+        for row in db.execute(select(*cols).where(models.Job.url.in_(chunk))):
+            found[row.url] = row._asdict()
+    return found
+
+
+def _sign(title: Optional[str], company: Optional[str], description: Optional[str]) -> Optional[bytes]:
+    """A job's MinHash signature for near-duplicate clustering, or None when dedupe is off."""
+    if not settings.dedupe_enabled:
+        return None
+    from app import dedupe  # numpy; loaded on first ingest, not at app startup
+
+    with metrics.stage("dedupe.signature"):
+        return dedupe.signature(title, company, description)
+
+
+def upsert_jobs(db: Session, jobs: Iterable[Dict]) -> Dict[str, int]:
+    """
+    Set-based ingestion for a batch of job dicts.
+
+    - rows without a url, and repeated urls within the batch, are skipped
+    - existing urls are looked up with one IN query per chunk (not per row)
+    - new rows go in with a single executemany INSERT
+    - existing rows get title/location/description updated only if they changed
+    - new and re-described rows get their text analysis (app/analysis.py) stored
+    - new, re-titled and re-described rows are (re)clustered with their
+      near-duplicates from other sources (app/dedupe.py)
+
+    `inserted` counts the rows actually written: a url another writer inserted
+    since the lookup is left alone by the INSERT and counted as skipped.
+
+    Does not commit; the caller owns the transaction.
+    """
+    batch: Dict[str, Dict] = {}
+    skipped = 0
+    for j in jobs:
+        url = j.get("url")
+        if not url or url in batch:
+            skipped += 1
+            continue
+        row = {c: j.get(c) for c in JOB_COLUMNS}
+        row["content_hash"] = content_hash(row["description"])
+        batch[url] = row
+
+    if not batch:
+        return {"inserted": 0, "updated": 0, "skipped": skipped}
+
+    with metrics.stage("ingest.lookup"):
+        existing = _existing_by_url(db, list(batch))
+
+    new_rows = []
+    changed = []
+    reindex: List[int] = []
+    for url, j in batch.items():
+        cur = existing.get(url)
+        if cur is None:
+            j.update(analyze_description(j["description"]))
+            j["minhash"] = _sign(j["title"], j["company"], j["description"])
+            new_rows.append(j)
+            continue
+        diff = {c: j[c] for c in UPDATABLE if j[c] is not None and j[c] != cur[c]}
+        if diff:
+            if "description" in diff:
+                diff["content_hash"] = j["content_hash"]
+                diff.update(analyze_description(j["description"]))
+            if "title" in diff or "description" in diff:
+                diff["minhash"] = _sign(
+                    diff.get("title", cur["title"]), j["company"], diff.get("description", cur["description"])
+                )
+                reindex.append(cur["id"])
+            diff["id"] = cur["id"]
+            changed.append(diff)
+        else:
+            skipped += 1
+
+    inserted = 0
+    with metrics.stage("ingest.write"):
+        if new_rows:
+            # another import/refresh may have inserted the same url since the lookup;
+            # ON CONFLICT DO NOTHING skips those, and the rowcount only counts real inserts
+            res = db.connection().execute(insert_on_conflict(models.Job.__table__, ["url"]), new_rows)
+            inserted = res.rowcount if res.rowcount >= 0 else len(new_rows)
+            skipped += len(new_rows) - inserted
+        # ORM bulk UPDATE by primary key; group by column set so each executemany is uniform
+        by_cols: Dict[tuple, List[Dict]] = {}
+        for d in changed:
+            by_cols.setdefault(tuple(sorted(d)), []).append(d)
+        for rows in by_cols.values():
+            db.execute(update(models.Job), rows)
+
+    if settings.dedupe_enabled and (new_rows or reindex):
+        from app import dedupe  # numpy; only loaded when dedupe is on
+
+        # ids of the rows just inserted (or already present via a concurrent insert)
+        signed = [j["url"] for j in new_rows if j["minhash"] is not None]
+        new_ids = [r["id"] for r in _existing_by_url(db, signed).values()]
+        dedupe.index_jobs(db, new_ids, fresh=True)
+        dedupe.index_jobs(db, reindex)
+
+    metrics.ROWS_INGESTED.inc(inserted, outcome="inserted")
+    metrics.ROWS_INGESTED.inc(len(changed), outcome="updated")
+    metrics.ROWS_INGESTED.inc(skipped, outcome="skipped")
+    return {"inserted": inserted, "updated": len(changed), "skipped": skipped}
+
+
+def sync_board(db: Session, source: str, company: str, urls: Set[str]) -> Dict[str, int]:
+    """
+    Reconcile a target's stored jobs with the urls its board lists right now:
+    active jobs that are no longer listed are deactivated (closed_at stamped),
+    inactive ones that are listed again are reactivated. Call with the full
+    board listing only (a fetch that succeeded), never a partial or failed one.
+
+    Does not commit; the caller owns the transaction.
+    """
+    Job = models.Job
+    of_target = (Job.source == source, Job.company == company)
+    stored = db.execute(select(Job.url, Job.is_active, Job.cluster_id).where(*of_target)).all()
+    gone = [r.url for r in stored if r.is_active is not False and r.url not in urls]
+    back = [r.url for r in stored if r.is_active is False and r.url in urls]
+    # clusters whose canonical job may change with these flips
+    clusters = {
+        r.cluster_id for r in stored
+        if r.cluster_id is not None and (r.is_active is False) == (r.url in urls)
+    }
+
+    with metrics.stage("ingest.sync"):
+        now = utcnow()
+        for i in range(0, len(gone), LOOKUP_CHUNK):
+            db.execute(
+                update(Job)
+                .where(*of_target, Job.url.in_(gone[i:i + LOOKUP_CHUNK]))
+                .values(is_active=False, closed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        for i in range(0, len(back), LOOKUP_CHUNK):
+            db.execute(
+                update(Job)
+                .where(*of_target, Job.url.in_(back[i:i + LOOKUP_CHUNK]))
+                .values(is_active=True, closed_at=None)
+                .execution_options(synchronize_session=False)
+            )
+        if clusters:
+            from app import dedupe
+
+            dedupe.recanonicalize(db, clusters)
+
+    metrics.ROWS_INGESTED.inc(len(gone), outcome="deactivated")
+    metrics.ROWS_INGESTED.inc(len(back), outcome="reactivated")
+    return {"deactivated": len(gone), "reactivated": len(back)}
+
+
+def archive_closed_jobs(db: Session, older_than_days: int) -> int:
+    """
+    Move jobs that have been inactive for `older_than_days` into jobs_archive
+    (and drop their match scores). Returns the number archived.
+
+    Does not commit; the caller owns the transaction.
+    """
+    Job, Archive = models.Job, models.JobArchive
+    cutoff = utcnow() - timedelta(days=older_than_days)
+    closed = select(Job.id).where(Job.is_active == False, Job.closed_at <= cutoff)
+
+    cols = ["id", "source", "company", "title", "location", "url", "description",
+            "department", "scraped_at", "closed_at"]
+    clusters = [c for (c,) in db.execute(
+        select(Job.cluster_id).where(Job.id.in_(closed), Job.cluster_id.isnot(None)).distinct()
+    )]
+    # a job archived, reopened and closed again replaces its old archive row
+    db.execute(delete(Archive).where(Archive.id.in_(closed)))
+    n = db.execute(insert(Archive).from_select(
+        cols, select(*[getattr(Job, c) for c in cols]).where(Job.id.in_(closed))
+    )).rowcount
+    db.execute(delete(models.MatchScore).where(models.MatchScore.job_id.in_(closed)))
+    db.execute(delete(models.JobLSH).where(models.JobLSH.job_id.in_(closed)))
+    db.execute(delete(Job).where(Job.id.in_(closed)).execution_options(synchronize_session=False))
+    if clusters:
+        from app import dedupe
+
+        dedupe.recanonicalize(db, clusters)
+    return n or 0
+
+
+def import_jobs_stream(
+    db: Session,
+    stream: TextIO,
+    chunk_size: Optional[int] = None,
+    max_errors: Optional[int] = None,
+) -> Dict:
+    """
+    Import a jobs CSV from a text stream in chunks of `chunk_size` rows,
+    committing after each chunk so memory stays flat regardless of file size.
+
+    Bad rows are rejected with their line number instead of aborting the import.
+    Only the first `max_errors` rejections are listed; all are counted.
+    """
+    chunk_size = chunk_size or settings.import_chunk_size
+    max_errors = settings.import_max_errors if max_errors is None else max_errors
+
+    totals = {"inserted": 0, "updated": 0, "skipped": 0, "rejected": 0}
+    errors: List[Dict] = []
+    chunk: List[Dict] = []
+
+    def flush():
+        stats = upsert_jobs(db, chunk)
+        db.commit()
+        for k, v in stats.items():
+            totals[k] += v
+        chunk.clear()
+
+    for line, job, err in iter_jobs_csv(stream):
+        if err:
+            totals["rejected"] += 1
+            if len(errors) < max_errors:
+                errors.append({"line": line, "error": err})
+            continue
+        chunk.append(job)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    return {**totals, "errors": errors}
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+# Tokens keep the characters that matter in tech names ("c++", "c#", "node.js", ".net").
+# Everything else (spaces, "/", "-", ",", ...) is a boundary, so a vocabulary phrase can
+# only ever match whole tokens: "git" never matches inside "digital".
+TOKEN_RE = re.compile(r"(?:(?<![a-z0-9])\.)?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Used when the vocabulary file is missing (the original hard-coded tool list)
+DEFAULT_VOCAB = [
+    "databricks", "spark", "python", "sql", "snowflake", "azure", "aws", "gcp", "synapse",
+    "adf", "airflow", "dbt", "kafka", "hadoop", "tableau", "power bi", "kibana", "elasticsearch",
+    "terraform", "docker", "kubernetes", "delta lake", "pyspark", "scala", "java", "git",
+    "fastapi", "sqlalchemy", "nifi", "opensearch", "s3", "blob storage", "lakehouse", "druid",
+]
+
+_END = ""  # trie key marking "a phrase ends here"; never a valid token
+
+# Part of the vocabulary version, so stored keywords are recomputed when the
+# matching rules change and not only when the vocabulary file does.
+# 2: overlapping matches ("aws s3" is both aws and s3)
+MATCH_RULES = "2"
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def load_vocab(path: str) -> List[Tuple[str, List[str]]]:
+    """
+    Parse a vocabulary file: one `canonical | alias | alias` entry per line,
+    '#' starts a comment line. Returns (canonical, aliases) pairs.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [p.strip().lower() for p in line.split("|")]
+            parts = [p for p in parts if p]
+            if parts:
+                entries.append((parts[0], parts[1:]))
+    return entries
+
+
+class KeywordMatcher:
+    """
+    Single-pass, token-bounded phrase matcher.
+
+    Every canonical name and alias is tokenized and inserted into a token trie.
+    Matching walks the text's tokens once and reports every phrase that starts
+    at each position, overlaps included: "AWS S3" is both aws (the token) and s3
+    (via its "aws s3" alias), so a compound alias never hides a skill it names.
+    Cost grows with the text length and the longest phrase, not with the
+    vocabulary size.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, List[str]]], version: str = ""):
+        self.version = version
+        self._trie: Dict = {}
+        self._phrases: Dict[Tuple[str, ...], str] = {}
+        for canonical, aliases in entries:
+            for phrase in [canonical, *aliases]:
+                toks = tuple(tokenize(phrase))
+                # first definition wins if two entries claim the same phrase
+                if not toks or toks in self._phrases:
+                    continue
+                self._phrases[toks] = canonical
+                node = self._trie
+                for t in toks:
+                    node = node.setdefault(t, {})
+                node[_END] = canonical
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical keywords found in `text`, in order of first appearance."""
+        toks = tokenize(text)
+        trie = self._trie
+        out: List[str] = []
+        seen = set()
+        n = len(toks)
+        for i in range(n):
+            node = trie.get(toks[i])
+            j = i + 1
+            while node is not None:
+                hit = node.get(_END)
+                if hit is not None and hit not in seen:
+                    seen.add(hit)
+                    out.append(hit)
+                if j == n:
+                    break
+                node = node.get(toks[j])
+                j += 1
+        return out
+
+    def canonical(self, phrase: str) -> str:
+        """Map a skill name to its canonical form ("PowerBI" -> "power bi")."""
+        hit = self._phrases.get(tuple(tokenize(phrase)))
+        return hit if hit is not None else (phrase or "").strip().lower()
+
+
+_matcher: Optional[KeywordMatcher] = None
+_matcher_key: Optional[Tuple[str, float]] = None
+_lock = threading.Lock()
+
+
+def get_matcher() -> KeywordMatcher:
+    """
+    Compiled matcher for settings.vocab_path, rebuilt only when the file's
+    mtime changes. Falls back to DEFAULT_VOCAB if the file doesn't exist.
+    """
+    global _matcher, _matcher_key
+    path = settings.vocab_path
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = -1.0
+    key = (path, mtime)
+    if _matcher is not None and _matcher_key == key:
+        return _matcher
+
+    with _lock:
+        if _matcher is None or _matcher_key != key:
+            if mtime < 0:
+                entries = [(k, []) for k in DEFAULT_VOCAB]
+            else:
+                entries = load_vocab(path)
+            # version changes whenever the vocabulary content does; cached scores key on it
+            h = hashlib.sha1(MATCH_RULES.encode("utf-8"))
+            for c, a in entries:
+                h.update(("|".join([c, *a]) + "\n").encode("utf-8"))
+            version = h.hexdigest()[:12]
+            _matcher = KeywordMatcher(entries, version=version)
+            _matcher_key = key
+    return _matcher
+
+
+def vocab_version() -> str:
+    return get_matcher().version
@@ -1,72 +1,102 @@
 import os
-import json
 import io
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+import shutil
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 
-from app.db import Base, engine, get_db
+from app.db import engine, get_db
+from app.migrations import run_migrations
 from app.config import settings
-from app import models, schemas
-from app.sources.greenhouse import fetch_greenhouse_jobs
-from app.sources.lever import fetch_lever_jobs
-from app.scoring import score_job
-from app.tailoring import build_tailored_resume_content
-from app.docgen import generate_resume_docx
-from app.utils import safe_slug, render_template
-from app.importers.csv_import import parse_jobs_csv
-
-from pypdf import PdfReader
-
-Base.metadata.create_all(bind=engine)
-app = FastAPI(title=settings.app_name)
-
-
-def _profile_to_dict(p: models.Profile) -> dict:
-    skills = [s.strip() for s in (p.skills_csv or "").split(",") if s.strip()]
-    bullets = [b.strip() for b in (p.truth_bullets or "").split("\n") if b.strip()]
-    return {
-        "id": p.id,
-        "full_name": p.full_name,
-        "email": p.email,
-        "phone": p.phone,
-        "location": p.location,
-        "linkedin": p.linkedin,
-        "summary": p.summary,
-        "skills": skills,
-        "truth_bullets": bullets,
-        "resume_text": p.resume_text or "",
-    }
+from app import metrics, models, packets, resume, schemas
+from app.refresh import claim_targets, refresh_targets, release_targets, targets_needing_hydration
+from app.ranking import refresh_scores, refresh_scores_many, top_scored_jobs
+from app.packets import (
+    build_packet, generate_packets, base_resume_path, load_packet_templates, profile_packets_dir,
+    profile_to_dict, job_to_dict,
+)
+from app.ingest import import_jobs_stream
+from app.search import search_jobs, search_supported
+from app.tasks import manager as task_manager
+from app.templating import TemplateError
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup is a startup step, not an import side effect: importing
+    # app.main opens no DB connection (scripts/check_startup.py enforces it)
+    run_migrations(engine)
+    # background refresh workers + per-target scheduler (app/tasks.py)
+    task_manager.start(scheduler=settings.scheduler_enabled)
+    yield
+    task_manager.stop()
+    resume.shutdown()
+    packets.shutdown()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    # request latency + SQL count per route; stages timed during the request
+    # (app/metrics.py) are collected on `prof`
+    prof, token = metrics.begin_request()
+    t0 = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        metrics.end_request(token)
+    elapsed = time.perf_counter() - t0
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.HTTP_SECONDS.observe(elapsed, method=request.method, route=route, status=response.status_code)
+    metrics.DB_QUERIES_PER_REQUEST.observe(prof.queries, route=route)
+    if settings.profiling_enabled and request.headers.get("x-profile") in ("1", "true"):
+        response.headers["Server-Timing"] = f'total;dur={elapsed * 1000:.2f}, ' + prof.server_timing()
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _get_profile(db: Session, profile_id: Optional[int] = None) -> models.Profile:
+    # No id means the first profile, so single-candidate clients keep working unchanged
+    if profile_id is None:
+        p = db.query(models.Profile).order_by(models.Profile.id).first()
+        if not p:
+            raise HTTPException(400, "Create a profile first with POST /profile")
+        return p
+    p = db.get(models.Profile, profile_id)
+    if not p:
+        raise HTTPException(404, "Profile not found")
+    return p
+
+
+def _apply_profile(p: models.Profile, payload: schemas.ProfileIn) -> None:
+    p.full_name = payload.full_name
+    p.email = payload.email
+    p.phone = payload.phone
+    p.location = payload.location
+    p.linkedin = payload.linkedin
+    p.summary = payload.summary
+    p.skills_csv = ",".join(payload.skills)
+    p.truth_bullets = "\n".join(payload.truth_bullets)
 
 
 # Change 1: replace POST /profile logic to “update if exists”
 @app.post("/profile", response_model=schemas.ProfileOut)
 def create_or_update_profile(payload: schemas.ProfileIn, db: Session = Depends(get_db)):
-    existing = db.query(models.Profile).first()
-
-    if existing:
-        existing.full_name = payload.full_name
-        existing.email = payload.email
-        existing.phone = payload.phone
-        existing.location = payload.location
-        existing.linkedin = payload.linkedin
-        existing.summary = payload.summary
-        existing.skills_csv = ",".join(payload.skills)
-        existing.truth_bullets = "\n".join(payload.truth_bullets)
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    p = models.Profile(
-        full_name=payload.full_name,
-        email=payload.email,
-        phone=payload.phone,
-        location=payload.location,
-        linkedin=payload.linkedin,
-        summary=payload.summary,
-        skills_csv=",".join(payload.skills),
-        truth_bullets="\n".join(payload.truth_bullets),
-    )
-    db.add(p)
+    # the single-candidate API: always the first profile (see /profiles for more)
+    p = db.query(models.Profile).order_by(models.Profile.id).first()
+    if not p:
+        p = models.Profile()
+        db.add(p)
+    _apply_profile(p, payload)
     db.commit()
     db.refresh(p)
     return p
@@ -75,51 +105,112 @@ def create_or_update_profile(payload: schemas.ProfileIn, db: Session = Depends(g
 # Change 2: add GET /profile to confirm what’s saved
 @app.get("/profile", response_model=schemas.ProfileOut)
 def get_profile(db: Session = Depends(get_db)):
-    p = db.query(models.Profile).first()
+    p = db.query(models.Profile).order_by(models.Profile.id).first()
     if not p:
         raise HTTPException(status_code=404, detail="No profile found")
     return p
 
 
-@app.post("/profile/resume/upload")
-async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    profile = db.query(models.Profile).first()
-    if not profile:
-        raise HTTPException(400, "Create a profile first with POST /profile")
+@app.post("/profiles", response_model=schemas.ProfileOut)
+def create_profile(payload: schemas.ProfileIn, db: Session = Depends(get_db)):
+    p = models.Profile()
+    _apply_profile(p, payload)
+    db.add(p)
+    db.commit()
+    db.refresh(p)
+    return p
+
 
+@app.get("/profiles", response_model=list[schemas.ProfileOut])
+def list_profiles(db: Session = Depends(get_db)):
+    return db.query(models.Profile).order_by(models.Profile.id).all()
+
+
+@app.get("/profiles/{profile_id}", response_model=schemas.ProfileOut)
+def get_profile_by_id(profile_id: int, db: Session = Depends(get_db)):
+    return _get_profile(db, profile_id)
+
+
+@app.put("/profiles/{profile_id}", response_model=schemas.ProfileOut)
+def update_profile(profile_id: int, payload: schemas.ProfileIn, db: Session = Depends(get_db)):
+    p = _get_profile(db, profile_id)
+    _apply_profile(p, payload)
+    db.commit()
+    db.refresh(p)
+    return p
+
+
+@app.delete("/profiles/{profile_id}")
+def delete_profile(profile_id: int, db: Session = Depends(get_db)):
+    p = _get_profile(db, profile_id)
+    db.query(models.MatchScore).filter(models.MatchScore.profile_id == p.id).delete(synchronize_session=False)
+    db.delete(p)
+    db.commit()
+    # a later profile may reuse the id; it must not inherit this one's cached packets
+    shutil.rmtree(profile_packets_dir(profile_id), ignore_errors=True)
+    return {"ok": True}
+
+
+async def _store_resume(profile: models.Profile, file: UploadFile, db: Session) -> dict:
     filename = (file.filename or "").lower()
-    content = await file.read()
-
-    text = ""
-    if filename.endswith(".pdf"):
-        try:
-            reader = PdfReader(io.BytesIO(content))  # type: ignore
-        except Exception:
-            # fallback: write temp
-            tmp = "./data/_tmp_resume.pdf"
-            os.makedirs("./data", exist_ok=True)
-            with open(tmp, "wb") as f:
-                f.write(content)
-            reader = PdfReader(tmp)
-        for page in reader.pages:
-            text += (page.extract_text() or "") + "\n"
-    else:
+    if not filename.endswith(".pdf"):
         raise HTTPException(
             400,
             "Only PDF resume parsing is enabled in this starter. (DOCX parsing can be added later.)",
         )
-
-    profile.resume_text = text.strip()
+    # read at most one byte past the limit instead of the whole upload
+    content = await file.read(settings.resume_max_bytes + 1)
+    if len(content) > settings.resume_max_bytes:
+        raise HTTPException(413, f"Resume is larger than {settings.resume_max_bytes} bytes")
+
+    # parsing is CPU-bound; keep it off the event loop (app/resume.py)
+    try:
+        text = await run_in_threadpool(resume.extract_pdf_text, content)
+    except resume.ResumeError as e:
+        raise HTTPException(400, str(e))
+
+    profile.resume_text = text
     db.commit()
     return {"ok": True, "chars": len(profile.resume_text)}
 
 
+@app.post("/profile/resume/upload")
+async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return await _store_resume(_get_profile(db), file, db)
+
+
+@app.post("/profiles/{profile_id}/resume/upload")
+async def upload_profile_resume(profile_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return await _store_resume(_get_profile(db, profile_id), file, db)
+
+
+@app.post("/scores/refresh", response_model=schemas.ScoreRefreshOut)
+def refresh_all_scores(payload: Optional[schemas.ScoreRefreshIn] = None, db: Session = Depends(get_db)):
+    # profiles x jobs in one pass over the jobs table (ranking.refresh_scores_many)
+    q = db.query(models.Profile)
+    if payload and payload.profile_ids:
+        q = q.filter(models.Profile.id.in_(payload.profile_ids))
+    profiles = {p.id: p for p in q.all()}
+    missing = sorted(set(payload.profile_ids if payload else []) - set(profiles))
+    if missing:
+        raise HTTPException(404, f"Profile not found: {missing}")
+
+    inputs = {}
+    for pid, p in profiles.items():
+        prof = profile_to_dict(p)
+        inputs[pid] = (prof["skills"], prof["truth_bullets"])
+    rescored = refresh_scores_many(db, inputs)
+    db.commit()
+    return schemas.ScoreRefreshOut(rescored=rescored)
+
+
 @app.post("/targets/greenhouse")
 def add_greenhouse_target(payload: schemas.TargetIn, db: Session = Depends(get_db)):
     t = models.Target(
         source="greenhouse",
         company_token=payload.company_token,
         display_name=payload.display_name,
+        refresh_interval_minutes=payload.refresh_interval_minutes,
     )
     db.add(t)
     db.commit()
@@ -132,195 +223,179 @@ def add_lever_target(payload: schemas.TargetIn, db: Session = Depends(get_db)):
         source="lever",
         company_token=payload.company_token,
         display_name=payload.display_name,
+        refresh_interval_minutes=payload.refresh_interval_minutes,
     )
     db.add(t)
     db.commit()
     return {"ok": True}
 
 
-@app.post("/jobs/refresh")
+@app.post("/jobs/refresh", response_model=schemas.TaskOut, status_code=202)
 def refresh_jobs(db: Session = Depends(get_db)):
-    targets = db.query(models.Target).all()
-    if not targets:
+    if not db.query(models.Target).first():
         raise HTTPException(400, "No targets found. Add greenhouse/lever targets first.")
 
-    inserted = 0
-    for t in targets:
-        if t.source == "greenhouse":
-            jobs = fetch_greenhouse_jobs(t.company_token)
-        elif t.source == "lever":
-            jobs = fetch_lever_jobs(t.company_token)
-        else:
-            continue
-
-        for j in jobs:
-            if not j.get("url"):
-                continue
-            exists = db.query(models.Job).filter(models.Job.url == j["url"]).first()
-            if exists:
-                continue
-            db.add(models.Job(**j))
-            inserted += 1
-    db.commit()
-    return {"inserted": inserted}
-
-
-@app.post("/jobs/import/csv")
-async def import_jobs_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    content = (await file.read()).decode("utf-8", errors="replace")
-    rows = parse_jobs_csv(content)
-    inserted = 0
-    for j in rows:
-        exists = db.query(models.Job).filter(models.Job.url == j["url"]).first()
-        if exists:
-            continue
-        db.add(models.Job(**j))
-        inserted += 1
-    db.commit()
-    return {"inserted": inserted}
+    # Runs in the background; poll GET /tasks/{id}. A refresh already in flight is
+    # returned instead of starting a second one.
+    return task_manager.submit_refresh().to_out()
+
+
+@app.get("/tasks", response_model=list[schemas.TaskOut])
+def list_tasks(limit: int = 50):
+    return [t.to_out() for t in task_manager.list(limit=max(1, limit))]
+
+
+@app.get("/tasks/{task_id}", response_model=schemas.TaskOut)
+def get_task(task_id: str):
+    task = task_manager.get(task_id)
+    if not task:
+        raise HTTPException(404, "Task not found")
+    return task.to_out()
+
+
+@app.post("/jobs/hydrate", response_model=schemas.RefreshOut)
+def hydrate_jobs(limit: Optional[int] = None, db: Session = Depends(get_db)):
+    # Fill in descriptions for Greenhouse jobs ingested without one by refetching their
+    # boards in content mode, bypassing the response cache. Boards commit one at a time,
+    # so repeating the call resumes where an interrupted run stopped.
+    # Boards a background refresh is working on are left for the next call.
+    targets = targets_needing_hydration(db, limit=limit)
+    claimed = claim_targets(db, [t.id for t in targets])
+    try:
+        return refresh_targets(db, [t for t in targets if t.id in claimed], force=True)
+    finally:
+        release_targets(db, claimed)
+
+
+@app.post("/jobs/import/csv", response_model=schemas.ImportOut)
+def import_jobs_csv(
+    file: UploadFile = File(...),
+    chunk_size: int = settings.import_chunk_size,
+    db: Session = Depends(get_db),
+):
+    # Decode the (disk-spooled) upload incrementally and ingest it chunk by chunk
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", errors="replace", newline="")
+    try:
+        return import_jobs_stream(db, stream, chunk_size=max(1, chunk_size))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    finally:
+        stream.detach()
 
 
 @app.get("/jobs/top", response_model=list[schemas.JobOut])
-def top_jobs(limit: int = 25, db: Session = Depends(get_db)):
-    profile = db.query(models.Profile).first()
-    if not profile:
-        raise HTTPException(400, "Create a profile first with POST /profile")
-    prof = _profile_to_dict(profile)
-
-    jobs = db.query(models.Job).filter(models.Job.is_active == True).all()
-    scored = []
-    for job in jobs:
-        s, matched, missing = score_job(
-            prof["skills"], prof["truth_bullets"], job.description or ""
-        )
-        scored.append((s, job))
-        ms = (
-            db.query(models.MatchScore)
-            .filter(
-                models.MatchScore.job_id == job.id,
-                models.MatchScore.profile_id == profile.id,
-            )
-            .first()
-        )
-        if not ms:
-            ms = models.MatchScore(
-                job_id=job.id,
-                profile_id=profile.id,
-                score=s,
-                matched_keywords=",".join(matched),
-                missing_keywords=",".join(missing),
-            )
-            db.add(ms)
-        else:
-            ms.score = s
-            ms.matched_keywords = ",".join(matched)
-            ms.missing_keywords = ",".join(missing)
+def top_jobs(limit: int = 25, profile_id: Optional[int] = None, db: Session = Depends(get_db)):
+    profile = _get_profile(db, profile_id)
+    prof = profile_to_dict(profile)
+
+    # Only jobs whose description or the profile's skills/bullets changed get rescored
+    refresh_scores(db, profile.id, prof["skills"], prof["truth_bullets"])
     db.commit()
+    return top_scored_jobs(db, profile.id, limit)
+
+
+@app.get("/jobs/search", response_model=schemas.JobSearchOut)
+def search(
+    q: str,
+    limit: int = 25,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    location: Optional[str] = None,
+    is_active: Optional[bool] = True,
+    db: Session = Depends(get_db),
+):
+    if not search_supported(engine):
+        raise HTTPException(501, "Full-text search requires SQLite (FTS5).")
+    try:
+        hits, next_cursor = search_jobs(
+            db, q, limit=max(1, min(limit, 200)), cursor=cursor,
+            source=source, location=location, is_active=is_active,
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    return schemas.JobSearchOut(results=hits, next_cursor=next_cursor)
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [j for _, j in scored[:limit]]
+
+def _require_base_resume() -> None:
+    base_resume = base_resume_path()
+    if not os.path.exists(base_resume):
+        raise HTTPException(
+            400, f"Missing template: {base_resume}. Put your resume template there."
+        )
 
 
 @app.post("/packets/generate/{job_id}", response_model=schemas.PacketOut)
-def generate_packet(job_id: int, db: Session = Depends(get_db)):
-    profile = db.query(models.Profile).first()
-    if not profile:
-        raise HTTPException(400, "Create a profile first with POST /profile")
+def generate_packet(job_id: int, profile_id: Optional[int] = None, db: Session = Depends(get_db)):
+    profile = _get_profile(db, profile_id)
     job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if not job:
         raise HTTPException(404, "Job not found")
+    _require_base_resume()
 
-    prof = _profile_to_dict(profile)
-    job_dict = {
-        "id": job.id,
-        "source": job.source,
-        "company": job.company,
-        "title": job.title,
-        "location": job.location,
-        "url": job.url,
-        "description": job.description or "",
-    }
-
-    content = build_tailored_resume_content(prof, job_dict)
-
-    safe_company = safe_slug(job.company, 40)
-    safe_title = safe_slug(job.title, 60)
-    packet_dir = os.path.join(
-        settings.packets_dir, f"{safe_company}_{safe_title}_{job.id}"
-    )
-    os.makedirs(packet_dir, exist_ok=True)
-
-    base_resume = os.path.join(settings.templates_dir, "resume_base.docx")
-    if not os.path.exists(base_resume):
-        raise HTTPException(
-            400, f"Missing template: {base_resume}. Put your resume template there."
-        )
-
-    resume_docx = os.path.join(packet_dir, "resume_tailored.docx")
-    generate_resume_docx(base_resume, resume_docx, content)
+    prof = profile_to_dict(profile)
+    job_dict = job_to_dict(db, job)
+    db.commit()
 
-    # cover letter templating
-    cover_template_path = os.path.join(settings.templates_dir, "cover_letter.md")
-    cover_template = ""
-    if os.path.exists(cover_template_path):
-        with open(cover_template_path, "r", encoding="utf-8") as f:
-            cover_template = f.read()
-    else:
-        cover_template = (
-            "Hi {{HIRING_TEAM}},\n\nI’m applying for {{JOB_TITLE}} at {{COMPANY}}.\n\n"
-            "Thanks,\n{{FULL_NAME}}"
+    try:
+        packet = build_packet(
+            prof, job_dict, base_resume_path(), load_packet_templates(), profile_packets_dir(profile.id)
         )
-
-    matched_bullets = ""
-    mk = content.get("matched_keywords") or []
-    if mk:
-        matched_bullets = "\n".join([f"- {k}" for k in mk[:10]])
+    except TemplateError as e:
+        raise HTTPException(400, str(e))
+    return schemas.PacketOut(**packet)
+
+
+@app.post("/packets/generate", response_model=schemas.PacketBatchOut)
+def generate_packets_batch(payload: schemas.PacketBatchIn, db: Session = Depends(get_db)):
+    profile = _get_profile(db, payload.profile_id)
+    if not payload.job_ids and not payload.top:
+        raise HTTPException(400, "Provide job_ids or top")
+    if len(payload.job_ids) > settings.packets_batch_max:
+        raise HTTPException(400, f"At most {settings.packets_batch_max} job_ids per request")
+    _require_base_resume()
+    prof = profile_to_dict(profile)
+
+    results = []
+    canon = {}
+    if payload.job_ids:
+        # near-duplicates collapse onto their canonical job, built once
+        from app.dedupe import canonical_ids
+
+        canon = canonical_ids(db, payload.job_ids)
+        for jid in dict.fromkeys(payload.job_ids):
+            if canon.get(jid, jid) != jid:
+                results.append(schemas.PacketResult(job_id=jid, ok=False, duplicate_of=canon[jid]))
+        job_ids = list(dict.fromkeys(canon.get(jid, jid) for jid in payload.job_ids))
+        found = {
+            j.id: j
+            for j in db.query(models.Job).filter(models.Job.id.in_(job_ids)).all()
+        }
     else:
-        matched_bullets = "- data engineering\n- analytics\n- production pipelines"
-
-    cover_data = {
-        "HIRING_TEAM": "Hiring Team",
-        "JOB_TITLE": job.title,
-        "COMPANY": job.company,
-        "FULL_NAME": prof["full_name"],
-        "MATCHED_BULLETS": matched_bullets,
-    }
-    cover = render_template(cover_template, cover_data)
-
-    cover_letter_path = os.path.join(packet_dir, "cover_letter.md")
-    recruiter_msg_path = os.path.join(packet_dir, "recruiter_message.txt")
-    report_path = os.path.join(packet_dir, "match_report.json")
-
-    with open(cover_letter_path, "w", encoding="utf-8") as f:
-        f.write(cover)
-
-    recruiter_msg = f"""Hi — I’m interested in the {job.title} role at {job.company}.
-I have hands-on experience in {", ".join((content.get("matched_keywords") or [])[:6]) or "data engineering"} and can share a tailored resume.
-Are you the right person to speak with about next steps?
-"""
-    with open(recruiter_msg_path, "w", encoding="utf-8") as f:
-        f.write(recruiter_msg)
-
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "job": job_dict,
-                "profile_id": prof["id"],
-                "matched_keywords": content.get("matched_keywords"),
-                "missing_keywords": content.get("missing_keywords"),
-                "tailored_bullets_used": content.get("tailored_bullets"),
-                "apply_url": job.url,
-                "note": "This tool generates documents and tracking data. Submit applications manually on the job site.",
-            },
-            f,
-            indent=2,
-        )
+        refresh_scores(db, profile.id, prof["skills"], prof["truth_bullets"])
+        db.commit()
+        top = top_scored_jobs(db, profile.id, min(payload.top, settings.packets_batch_max))
+        found = {j.id: j for j in top}
+        job_ids = [j.id for j in top]
+
+    results += [
+        schemas.PacketResult(job_id=jid, ok=False, error="Job not found")
+        for jid in job_ids if jid not in found
+    ]
+    jobs = [job_to_dict(db, found[jid]) for jid in job_ids if jid in found]
+    db.commit()
 
-    return schemas.PacketOut(
-        job_id=job.id,
-        packet_path=packet_dir,
-        resume_docx=resume_docx,
-        cover_letter=cover_letter_path,
-        recruiter_message=recruiter_msg_path,
-        match_report=report_path,
+    for r in generate_packets(prof, jobs, workers=payload.workers):
+        results.append(schemas.PacketResult(**r))
+
+    # manifest in request order; a canonical job sits where it was first asked for
+    order = {}
+    for i, jid in enumerate(payload.job_ids or job_ids):
+        order.setdefault(jid, i)
+        order.setdefault(canon.get(jid, jid), i)
+    results.sort(key=lambda r: order[r.job_id])
+    return schemas.PacketBatchOut(
+        generated=sum(1 for r in results if r.ok),
+        failed=sum(1 for r in results if not r.ok and r.duplicate_of is None),
+        duplicates=sum(1 for r in results if r.duplicate_of is not None),
+        results=results,
     )
@@ -0,0 +1,216 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Stage timings are mostly sub-millisecond to a few seconds
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_num(v)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            v = self._values.get(key)
+            if v is None:
+                v = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            v[0][i] += 1
+            v[1] += value
+            v[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, ([*c], s, n)) for k, (c, s, n) in self._values.items())
+        for key, (counts, total, n) in items:
+            cum = 0
+            for le, c in zip((*self.buckets, float("inf")), counts):
+                cum += c
+                le_label = 'le="%s"' % _num(le)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le_label)} {cum}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+_registry: List = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Every metric in Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_SECONDS = _register(Histogram(
+    "app_http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")))
+STAGE_SECONDS = _register(Histogram(
+    "app_stage_duration_seconds", "Time spent in an instrumented hot-path stage.", ("stage",)))
+DB_QUERIES = _register(Counter(
+    "app_db_queries_total", "SQL statements executed."))
+DB_QUERIES_PER_REQUEST = _register(Histogram(
+    "app_db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), COUNT_BUCKETS))
+JOBS_SCORED = _register(Counter(
+    "app_jobs_scored_total", "Jobs scored against a profile."))
+ROWS_INGESTED = _register(Counter(
+    "app_rows_ingested_total", "Job rows written by ingestion, by outcome.", ("outcome",)))
+FETCHES = _register(Counter(
+    "app_board_fetches_total", "Job board fetches, by source and outcome.", ("source", "outcome")))
+FETCH_SECONDS = _register(Histogram(
+    "app_board_fetch_duration_seconds", "Job board fetch latency.", ("source",)))
+PACKETS = _register(Counter(
+    "app_packets_total", "Application packets built, by outcome.", ("outcome",)))
+
+
+class RequestProfile:
+    """Per-request accumulator: stage -> [seconds, calls], plus the SQL statement count."""
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            s = self.stages.get(stage)
+            if s is None:
+                self.stages[stage] = [seconds, 1]
+            else:
+                s[0] += seconds
+                s[1] += 1
+
+    def count_query(self) -> None:
+        with self._lock:
+            self.queries += 1
+
+    def server_timing(self) -> str:
+        """Stage breakdown as a Server-Timing header value (durations in ms)."""
+        with self._lock:
+            items = sorted(self.stages.items(), key=lambda kv: -kv[1][0])
+            parts = [f'{name};dur={t * 1000:.2f};desc="{int(n)}x"' for name, (t, n) in items]
+            parts.append(f'db;desc="{self.queries} queries"')
+        return ", ".join(parts)
+
+
+# Set per request by the middleware in app/main.py. Sync endpoints run in a
+# threadpool that copies the context, so stages timed there land on the request.
+_current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("request_profile", default=None)
+
+
+def begin_request() -> Tuple[RequestProfile, contextvars.Token]:
+    prof = RequestProfile()
+    return prof, _current.set(prof)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def record(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    prof = _current.get()
+    if prof is not None:
+        prof.add(stage, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as `name` in the stage histogram (and the current request's breakdown)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+
+def instrument_engine(engine) -> None:
+    """Count SQL statements and time them as the "sql" stage."""
+    from sqlalchemy import event
+
+    # The start time lives on the statement's execution context, not the
+    # connection, so a statement that raises leaves nothing behind.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_t0 = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        t0 = getattr(context, "_query_t0", None)
+        DB_QUERIES.inc()
+        prof = _current.get()
+        if prof is not None:
+            prof.count_query()
+        if t0 is not None:
+            record("sql", time.perf_counter() - t0)
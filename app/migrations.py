@@ -0,0 +1,147 @@
+"""
+Minimal forward-only schema migrations.
+
+`Base.metadata.create_all` only creates missing tables; it never adds columns or
+indexes to a table that already exists. Each migration here is applied once, in
+order, and recorded in `schema_migrations`, so databases created by older
+versions of the app are brought up to the current models.
+
+Add new steps to the end of MIGRATIONS; never edit or reorder applied ones.
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db import Base
+
+
+def _add_columns(conn: Connection, table: str, columns: List[Tuple[str, str]]) -> None:
+    have = {c["name"] for c in inspect(conn).get_columns(table)}
+    for name, ddl_type in columns:
+        if name not in have:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"))
+
+
+def _0001_baseline(conn: Connection) -> None:
+    from app import models  # noqa: F401  (register tables on Base.metadata)
+    Base.metadata.create_all(bind=conn)
+
+
+def _0002_cache_and_analysis_columns(conn: Connection) -> None:
+    # columns added for incremental scoring, per-job analysis and the board HTTP cache
+    _add_columns(conn, "jobs", [
+        ("content_hash", "VARCHAR"),
+        ("normalized_text", "TEXT"),
+        ("keywords_csv", "TEXT"),
+        ("analysis_version", "VARCHAR"),
+    ])
+    _add_columns(conn, "match_scores", [
+        ("profile_fingerprint", "VARCHAR"),
+        ("job_hash", "VARCHAR"),
+    ])
+    _add_columns(conn, "targets", [
+        ("etag", "VARCHAR"),
+        ("last_modified", "VARCHAR"),
+        ("body_hash", "VARCHAR"),
+    ])
+
+
+def _0003_indexes(conn: Connection) -> None:
+    # keep only the newest score per (job, profile) before enforcing uniqueness
+    conn.execute(text("""
+        DELETE FROM match_scores WHERE id NOT IN (
+            SELECT MAX(id) FROM match_scores GROUP BY job_id, profile_id
+        )
+    """))
+    conn.execute(text("DROP INDEX IF EXISTS ix_match_scores_job_profile"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_match_scores_job_profile ON match_scores (job_id, profile_id)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_match_scores_profile_score ON match_scores (profile_id, score)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_is_active ON jobs (is_active)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_source ON jobs (source)"))
+
+
+def _0004_search_index(conn: Connection) -> None:
+    from app.search import ensure_search_index
+    ensure_search_index(conn)
+
+
+def _0005_target_schedule(conn: Connection) -> None:
+    _add_columns(conn, "targets", [
+        ("refresh_interval_minutes", "INTEGER"),
+        ("last_refreshed_at", "DATETIME"),
+    ])
+
+
+def _0006_board_sync(conn: Connection) -> None:
+    from app import models
+    _add_columns(conn, "jobs", [("closed_at", "DATETIME")])
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_source_company ON jobs (source, company)"))
+    models.JobArchive.__table__.create(bind=conn, checkfirst=True)
+
+
+def _0007_dedupe(conn: Connection) -> None:
+    from app import models
+    _add_columns(conn, "jobs", [
+        ("minhash", "BLOB"),
+        ("cluster_id", "INTEGER"),
+        ("is_canonical", "BOOLEAN DEFAULT 1"),
+    ])
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_cluster_id ON jobs (cluster_id)"))
+    models.JobLSH.__table__.create(bind=conn, checkfirst=True)
+    # existing jobs get signatures from scripts/dedupe_jobs.py
+
+
+def _0008_target_backoff(conn: Connection) -> None:
+    _add_columns(conn, "targets", [
+        ("last_attempt_at", "DATETIME"),
+        ("failure_count", "INTEGER DEFAULT 0"),
+    ])
+
+
+def _0009_jobs_version(conn: Connection) -> None:
+    from app.ranking import ensure_watermark
+    ensure_watermark(conn)
+
+
+def _0010_target_claims(conn: Connection) -> None:
+    _add_columns(conn, "targets", [("claimed_until", "DATETIME")])
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_baseline", _0001_baseline),
+    ("0002_cache_and_analysis_columns", _0002_cache_and_analysis_columns),
+    ("0003_indexes", _0003_indexes),
+    ("0004_search_index", _0004_search_index),
+    ("0005_target_schedule", _0005_target_schedule),
+    ("0006_board_sync", _0006_board_sync),
+    ("0007_dedupe", _0007_dedupe),
+    ("0008_target_backoff", _0008_target_backoff),
+    ("0009_jobs_version", _0009_jobs_version),
+    ("0010_target_claims", _0010_target_claims),
+]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply pending migrations, each in its own transaction. Returns the names applied."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " name VARCHAR PRIMARY KEY,"
+            " applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        done = {r[0] for r in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    applied = []
+    for name, fn in MIGRATIONS:
+        if name in done:
+            continue
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:n)"), {"n": name})
+        applied.append(name)
+    return applied
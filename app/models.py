@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, Index, LargeBinary
 from sqlalchemy.sql import func
 from app.db import Base
 
@@ -19,15 +19,51 @@ class Profile(Base):
 class Job(Base):
     __tablename__ = "jobs"
     id = Column(Integer, primary_key=True, index=True)
-    source = Column(String, nullable=False)       # greenhouse / lever / linkedin / indeed / dice / company
+    source = Column(String, nullable=False, index=True)  # greenhouse / lever / linkedin / indeed / dice / company
     company = Column(String, nullable=False)
     title = Column(String, nullable=False)
     location = Column(String, nullable=True)
     url = Column(Text, nullable=False, unique=True)
     description = Column(Text, nullable=True)
     department = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)  # sha1 of description, see utils.content_hash
+    normalized_text = Column(Text, nullable=True)    # normalized + lowercased description
+    keywords_csv = Column(Text, nullable=True)       # extracted vocabulary keywords (csv)
+    analysis_version = Column(String, nullable=True) # vocab version the analysis was built with
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
+    closed_at = Column(DateTime, nullable=True)  # when a board sync last found it gone
+    # near-duplicate clustering, see app/dedupe.py
+    minhash = Column(LargeBinary, nullable=True)     # MinHash signature of title/company/description
+    cluster_id = Column(Integer, nullable=True, index=True)  # NULL = no known duplicates
+    is_canonical = Column(Boolean, default=True)     # False = a duplicate of its cluster's canonical job
+
+    __table_args__ = (
+        # a target's jobs (see ingest.sync_board)
+        Index("ix_jobs_source_company", "source", "company"),
+    )
+
+class JobArchive(Base):
+    """Closed postings moved out of jobs by ingest.archive_closed_jobs."""
+    __tablename__ = "jobs_archive"
+    id = Column(Integer, primary_key=True)          # the id it had in jobs
+    source = Column(String, nullable=False)
+    company = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    location = Column(String, nullable=True)
+    url = Column(Text, nullable=False, index=True)
+    description = Column(Text, nullable=True)
+    department = Column(String, nullable=True)
+    scraped_at = Column(DateTime(timezone=True), nullable=True)
+    closed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class JobLSH(Base):
+    """LSH band buckets of Job.minhash: jobs sharing a bucket are near-duplicate candidates."""
+    __tablename__ = "job_lsh"
+    bucket = Column(Integer, primary_key=True)
+    job_id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = {"sqlite_with_rowid": False}
 
 class Target(Base):
     __tablename__ = "targets"
@@ -35,6 +71,16 @@ class Target(Base):
     source = Column(String, nullable=False)       # greenhouse / lever
     company_token = Column(String, nullable=False)
     display_name = Column(String, nullable=True)
+    # HTTP cache validators from the last successful fetch (see sources/engine.py)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    body_hash = Column(String, nullable=True)
+    # background scheduling (see app/tasks.py); NULL interval = settings default
+    refresh_interval_minutes = Column(Integer, nullable=True)
+    last_refreshed_at = Column(DateTime, nullable=True)
+    last_attempt_at = Column(DateTime, nullable=True)    # last fetch, successful or not
+    failure_count = Column(Integer, default=0)           # consecutive failed fetches (retry backoff)
+    claimed_until = Column(DateTime, nullable=True)      # refresh lease (app/refresh.py claim_targets)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class MatchScore(Base):
@@ -45,4 +91,14 @@ class MatchScore(Base):
     score = Column(Float, nullable=False)
     matched_keywords = Column(Text, nullable=True)    # csv
     missing_keywords = Column(Text, nullable=True)    # csv
+    profile_fingerprint = Column(String, nullable=True)  # scoring inputs from the profile
+    job_hash = Column(String, nullable=True)             # Job.content_hash at scoring time
     computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # One score per (job, profile); also lets the LEFT JOIN in ranking.refresh_scores
+        # probe (job, profile) directly instead of a quadratic plan.
+        Index("ux_match_scores_job_profile", "job_id", "profile_id", unique=True),
+        # ORDER BY score LIMIT n for one profile without sorting the whole table
+        Index("ix_match_scores_profile_score", "profile_id", "score"),
+    )
@@ -0,0 +1,365 @@
+import os
+import json
+import hashlib
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import metrics, models
+from app.analysis import job_analysis
+from app.config import settings
+from app.keywords import vocab_version
+from app.tailoring import build_tailored_resume_content
+from app.docgen import generate_resume_docx
+from app.templating import Template, load_template
+from app.utils import content_hash, safe_slug
+
+# Bump when what build_packet writes changes, so cached packets are rebuilt
+PACKET_VERSION = "1"
+
+DEFAULT_COVER_TEMPLATE = (
+    "Hi {{HIRING_TEAM}},\n\nI’m applying for {{JOB_TITLE}} at {{COMPANY}}.\n\n"
+    "Thanks,\n{{FULL_NAME}}"
+)
+DEFAULT_RECRUITER_TEMPLATE = (
+    "Hi — I’m interested in the {{JOB_TITLE}} role at {{COMPANY}}.\n"
+    "I have hands-on experience in {{TOP_KEYWORDS}} and can share a tailored resume.\n"
+    "Are you the right person to speak with about next steps?\n"
+)
+# Packet field -> (file in TEMPLATES_DIR that overrides it, built-in default)
+PACKET_TEMPLATES = {
+    "cover_letter": ("cover_letter.md", DEFAULT_COVER_TEMPLATE),
+    "recruiter_message": ("recruiter_message.txt", DEFAULT_RECRUITER_TEMPLATE),
+}
+
+# Job fields copied into match_report.json
+REPORT_JOB_FIELDS = ("id", "source", "company", "title", "location", "url", "description")
+# Profile fields that end up in a packet
+PROFILE_FIELDS = ("id", "full_name", "email", "phone", "location", "linkedin", "summary", "skills", "truth_bullets")
+# Packet field -> file name inside a version folder
+PACKET_FILES = {
+    "resume_docx": "resume_tailored.docx",
+    "cover_letter": "cover_letter.md",
+    "recruiter_message": "recruiter_message.txt",
+    "match_report": "match_report.json",
+}
+# Temporary folders older than this were left by a crashed writer
+STALE_TMP_SECONDS = 3600
+
+# path -> ((mtime_ns, size), sha1) for the template files in packet keys
+_file_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+
+def profile_to_dict(p: models.Profile) -> Dict:
+    skills = [s.strip() for s in (p.skills_csv or "").split(",") if s.strip()]
+    bullets = [b.strip() for b in (p.truth_bullets or "").split("\n") if b.strip()]
+    return {
+        "id": p.id,
+        "full_name": p.full_name,
+        "email": p.email,
+        "phone": p.phone,
+        "location": p.location,
+        "linkedin": p.linkedin,
+        "summary": p.summary,
+        "skills": skills,
+        "truth_bullets": bullets,
+        "resume_text": p.resume_text or "",
+    }
+
+
+def job_to_dict(db: Session, job: models.Job) -> Dict:
+    # Includes the stored text analysis so packet tailoring doesn't recompute it
+    normalized_text, keywords = job_analysis(db, job)
+    return {
+        "id": job.id,
+        "source": job.source,
+        "company": job.company,
+        "title": job.title,
+        "location": job.location,
+        "url": job.url,
+        "description": job.description or "",
+        "content_hash": job.content_hash,
+        "normalized_text": normalized_text,
+        "keywords": keywords,
+    }
+
+
+def base_resume_path() -> str:
+    return os.path.join(settings.templates_dir, "resume_base.docx")
+
+
+def profile_packets_dir(profile_id: int) -> str:
+    """Packets are kept per candidate, so two profiles applying to one job don't overwrite each other."""
+    return os.path.join(settings.packets_dir, f"profile_{profile_id}")
+
+
+def load_packet_templates() -> Dict[str, Template]:
+    """The compiled text templates for a packet (parsed once per file change, see app/templating.py)."""
+    return {
+        field: load_template(os.path.join(settings.templates_dir, fname), default=default)
+        for field, (fname, default) in PACKET_TEMPLATES.items()
+    }
+
+
+def _file_hash(path: str) -> str:
+    """Content hash of a template file, recomputed only when its mtime or size changes."""
+    st = os.stat(path)
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _file_hashes.get(path)
+    if cached is None or cached[0] != sig:
+        with open(path, "rb") as f:
+            cached = _file_hashes[path] = (sig, hashlib.sha1(f.read()).hexdigest())
+    return cached[1]
+
+
+def packet_key(prof: Dict, job: Dict, base_resume: str, templates: Dict[str, Template]) -> str:
+    """Hash of every input that shapes a packet; equal keys mean identical packets."""
+    return content_hash(
+        PACKET_VERSION,
+        vocab_version(),
+        json.dumps({k: prof.get(k) for k in PROFILE_FIELDS}, sort_keys=True),
+        json.dumps({k: job.get(k) for k in (*REPORT_JOB_FIELDS, "normalized_text", "keywords")}, sort_keys=True),
+        _file_hash(base_resume),
+        *(templates[field].digest for field in sorted(templates)),
+    )
+
+
+def _packet_files(version_dir: str) -> Dict[str, str]:
+    return {name: os.path.join(version_dir, fname) for name, fname in PACKET_FILES.items()}
+
+
+def _prune_versions(packet_dir: str, keep: str) -> None:
+    # oldest first; a reader may still hold an old version, so a few are kept
+    versions = []
+    for entry in os.scandir(packet_dir):
+        if not entry.is_dir():
+            continue
+        age = time.time() - entry.stat().st_mtime
+        if entry.name.startswith(".tmp-"):
+            if age > STALE_TMP_SECONDS:  # left behind by a crashed writer
+                shutil.rmtree(entry.path, ignore_errors=True)
+        elif entry.name != keep:
+            versions.append((entry.stat().st_mtime, entry.path))
+    versions.sort()
+    for _, path in versions[:max(0, len(versions) - (settings.packet_versions_kept - 1))]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def build_packet(
+    prof: Dict,
+    job: Dict,
+    base_resume: str,
+    templates: Dict[str, Template],
+    packets_dir: str,
+) -> Dict:
+    """
+    Write one application packet for `job` and return its file paths.
+
+    Packets are content-addressed: each lives in a version folder named after
+    packet_key() under the job's folder, so an unchanged packet is returned as
+    is ("cached": True) without retailoring. A new version is written to a
+    temporary folder and renamed into place, so a version folder that exists
+    is always complete.
+
+    `job` may carry the stored analysis ("normalized_text", "keywords") so
+    tailoring doesn't recompute it; it is turned into a JobAnalysis once per
+    process (app/analysis.py). Only plain dicts/strings go in and out,
+    so this can run in a worker process.
+    """
+    safe_company = safe_slug(job["company"], 40)
+    safe_title = safe_slug(job["title"], 60)
+    packet_dir = os.path.join(packets_dir, f"{safe_company}_{safe_title}_{job['id']}")
+    version = packet_key(prof, job, base_resume, templates)[:16]
+    version_dir = os.path.join(packet_dir, version)
+    if os.path.isdir(version_dir):
+        return {"job_id": job["id"], "packet_path": version_dir, "cached": True, **_packet_files(version_dir)}
+
+    os.makedirs(packet_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=packet_dir)
+    try:
+        _write_packet(prof, job, base_resume, templates, tmp_dir)
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # a concurrent build of the same inputs got there first; theirs is identical
+            if not os.path.isdir(version_dir):
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    _prune_versions(packet_dir, keep=version)
+    return {"job_id": job["id"], "packet_path": version_dir, "cached": False, **_packet_files(version_dir)}
+
+
+def _write_packet(prof: Dict, job: Dict, base_resume: str, templates: Dict[str, Template], packet_dir: str) -> None:
+    with metrics.stage("packets.tailor"):
+        content = build_tailored_resume_content(prof, job)
+
+    files = _packet_files(packet_dir)
+    generate_resume_docx(base_resume, files["resume_docx"], content)
+
+    matched_bullets = ""
+    mk = content.get("matched_keywords") or []
+    if mk:
+        matched_bullets = "\n".join([f"- {k}" for k in mk[:10]])
+    else:
+        matched_bullets = "- data engineering\n- analytics\n- production pipelines"
+
+    # one data dict for every text template; a template may use any of these keys
+    data = {
+        "HIRING_TEAM": "Hiring Team",
+        "JOB_TITLE": job["title"],
+        "COMPANY": job["company"],
+        "FULL_NAME": prof["full_name"],
+        "MATCHED_BULLETS": matched_bullets,
+        "TOP_KEYWORDS": ", ".join(mk[:6]) or "data engineering",
+    }
+    with metrics.stage("packets.render"):
+        rendered = {field: tpl.render(data) for field, tpl in templates.items()}
+
+    for field, text in rendered.items():
+        with open(files[field], "w", encoding="utf-8") as f:
+            f.write(text)
+
+    with open(files["match_report"], "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "job": {k: job.get(k) for k in REPORT_JOB_FIELDS},
+                "profile_id": prof["id"],
+                "matched_keywords": content.get("matched_keywords"),
+                "missing_keywords": content.get("missing_keywords"),
+                "tailored_bullets_used": content.get("tailored_bullets"),
+                "apply_url": job["url"],
+                "note": "This tool generates documents and tracking data. Submit applications manually on the job site.",
+            },
+            f,
+            indent=2,
+        )
+
+
+# One process pool for all batch requests, sized by PACKET_WORKERS and shut
+# down by the app's lifespan (or the CLI) via shutdown()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def max_workers() -> int:
+    return max(1, settings.packet_workers or os.cpu_count() or 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process is multi-threaded and holds DB connections
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next batch starts a fresh one (unless another thread already has)."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_one(shared: Dict, job: Dict) -> Dict:
+    try:
+        packet = build_packet(
+            shared["prof"], job, shared["base_resume"],
+            shared["templates"], shared["packets_dir"],
+        )
+        metrics.PACKETS.inc(outcome="cached" if packet["cached"] else "ok")
+        return {"job_id": job["id"], "ok": True, "packet": packet, "error": None}
+    except Exception as e:
+        metrics.PACKETS.inc(outcome="failed")
+        return {"job_id": job["id"], "ok": False, "packet": None, "error": f"{type(e).__name__}: {e}"}
+
+
+def _run_chunk(shared: Dict, jobs: List[Dict]) -> List[Dict]:
+    # the profile and templates travel once per chunk, not once per job
+    return [_run_one(shared, j) for j in jobs]
+
+
+def generate_packets(
+    prof: Dict,
+    jobs: List[Dict],
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[Dict], None]] = None,
+) -> List[Dict]:
+    """
+    Build packets for many jobs on the shared process pool. Returns one result
+    per job, in input order; a failing job is reported in its result instead of
+    failing the batch. `on_result` is called with each result as it arrives.
+
+    `workers` caps how many of the pool's processes this batch keeps busy; it
+    is clamped to max_workers().
+    """
+    shared = {
+        "prof": prof,
+        "base_resume": base_resume_path(),
+        "templates": load_packet_templates(),
+        "packets_dir": profile_packets_dir(prof["id"]),
+    }
+    workers = max(1, min(workers or max_workers(), max_workers(), len(jobs)))
+
+    def emit(rs: List[Dict], slot: int) -> None:
+        results[slot:slot + len(rs)] = rs
+        if on_result:
+            for r in rs:
+                on_result(r)
+
+    results: List[Dict] = [None] * len(jobs)
+    if workers == 1:
+        for i, j in enumerate(jobs):
+            emit([_run_one(shared, j)], i)
+        return results
+
+    size = max(1, len(jobs) // (workers * 4))
+    todo = deque(range(0, len(jobs), size))
+    pool = _get_pool()
+    running = {}
+    try:
+        while todo or running:
+            # keep at most `workers` chunks in flight, so one batch can't hold the whole pool
+            while todo and len(running) < workers:
+                i = todo[0]
+                f = pool.submit(_run_chunk, shared, jobs[i:i + size])
+                running[f] = todo.popleft()
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                i = running.pop(f)
+                rs = f.result()
+                # worker processes have their own metrics registry; count the outcomes here
+                for r in rs:
+                    metrics.PACKETS.inc(outcome=("cached" if r["packet"]["cached"] else "ok") if r["ok"] else "failed")
+                emit(rs, i)
+    except (BrokenProcessPool, RuntimeError, OSError):
+        # a worker died (killed, out of memory) or the pool was shut down:
+        # replace it, and finish what's left of this batch here
+        _discard_pool(pool)
+        for i in sorted([*todo, *running.values()]):
+            emit(_run_chunk(shared, jobs[i:i + size]), i)
+    return results
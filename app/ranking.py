@@ -0,0 +1,248 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, event, literal, or_, select, text, true, union_all, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app import metrics, models
+from app.db import insert_on_conflict
+from app.analysis import JobAnalysis, analyze_description, get_analysis, is_current, split_keywords
+from app.scoring import score_matrix, profile_fingerprint
+from app.utils import content_hash
+
+# Rows written per executemany when persisting scores
+WRITE_CHUNK = 1000
+# Jobs per bullets x jobs similarity matrix; bounds memory on very large rescoring runs
+SCORE_CHUNK = 5000
+# SQLite's bound-parameter limit is large on modern builds but 999 on older ones
+LOOKUP_CHUNK = 900
+# Profiles per stale-pairs query (SQLite caps a compound SELECT at 500 terms)
+PROFILE_CHUNK = 100
+
+# A counter bumped by triggers on every change that can make a stored score
+# stale: a job inserted or deleted, a job's content_hash / is_active /
+# is_canonical written, or a match_scores row deleted. While it and a
+# profile's fingerprint are unchanged, that profile has nothing stale and
+# refresh_scores_many skips the stale-pairs scan. Triggers (rather than the
+# writers) keep it current, so it holds for every ingestion path and process.
+WATERMARK_DDL = [
+    "CREATE TABLE IF NOT EXISTS jobs_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO jobs_version (id, version) VALUES (1, 0)",
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_version_ai AFTER INSERT ON jobs BEGIN
+        UPDATE jobs_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_version_ad AFTER DELETE ON jobs BEGIN
+        UPDATE jobs_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_version_au AFTER UPDATE OF content_hash, is_active, is_canonical ON jobs BEGIN
+        UPDATE jobs_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_version_msd AFTER DELETE ON match_scores BEGIN
+        UPDATE jobs_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+]
+
+# (database url, profile id) -> (fingerprint, jobs_version) it was last fully
+# scored at, in this process
+_fresh: Dict[Tuple[str, int], Tuple[str, int]] = {}
+_fresh_lock = threading.Lock()
+# Session.info key for freshness recorded by an uncommitted refresh
+_PENDING = "ranking_fresh"
+
+
+def ensure_watermark(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return  # no watermark: every refresh runs the stale-pairs scan
+    for ddl in WATERMARK_DDL:
+        conn.execute(text(ddl))
+
+
+def _jobs_version(db: Session) -> Optional[int]:
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    return db.execute(text("SELECT version FROM jobs_version WHERE id = 1")).scalar()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_fresh(session: Session) -> None:
+    # only scores that were actually committed count as fresh
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        with _fresh_lock:
+            _fresh.update(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_fresh(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def refresh_scores(db: Session, profile_id: int, skills: List[str], bullets: List[str]) -> int:
+    """refresh_scores_many for one profile. Returns the number of jobs rescored."""
+    return refresh_scores_many(db, {profile_id: (skills, bullets)})[profile_id]
+
+
+def _stale_pairs(db: Session, fps: Dict[int, str]) -> Dict[int, List[Tuple[int, int]]]:
+    """
+    job id -> [(profile id, match_scores id or None)] for every active, canonical
+    (app/dedupe.py) job whose score for that profile is missing or out of date:
+    a different profile fingerprint or a different job hash. One pass over jobs
+    for all the profiles in `fps`.
+    """
+    Job, MS = models.Job, models.MatchScore
+    sels = [select(literal(pid).label("profile_id"), literal(fp).label("fp")) for pid, fp in fps.items()]
+    p = (sels[0] if len(sels) == 1 else union_all(*sels)).subquery("p")
+    q = (
+        select(Job.id, p.c.profile_id, MS.id.label("ms_id"))
+        .select_from(Job)
+        .join(p, true())
+        .outerjoin(MS, and_(MS.job_id == Job.id, MS.profile_id == p.c.profile_id))
+        .where(Job.is_active == True, Job.is_canonical.isnot(False))
+        .where(or_(
+            MS.id.is_(None),
+            Job.content_hash.is_(None),
+            MS.profile_fingerprint.is_(None),
+            MS.profile_fingerprint != p.c.fp,
+            MS.job_hash.is_(None),
+            MS.job_hash != Job.content_hash,
+        ))
+    )
+    stale: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    for job_id, profile_id, ms_id in db.execute(q):
+        stale[job_id].append((profile_id, ms_id))
+    return stale
+
+
+def _analyzed(db: Session, job_ids: Sequence[int]) -> List:
+    Job = models.Job
+    cols = (Job.id, Job.description, Job.content_hash, Job.normalized_text, Job.keywords_csv, Job.analysis_version)
+    rows = []
+    for i in range(0, len(job_ids), LOOKUP_CHUNK):
+        rows.extend(db.execute(select(*cols).where(Job.id.in_(job_ids[i:i + LOOKUP_CHUNK]))))
+    return rows
+
+
+def refresh_scores_many(db: Session, profiles: Dict[int, Tuple[List[str], List[str]]]) -> Dict[int, int]:
+    """
+    Batch scoring engine: rescore the profiles x jobs pairs whose inputs changed
+    since they were last scored, for any number of profiles
+    ({profile_id: (skills, truth_bullets)}) in one pass over the jobs table.
+    Everything else keeps its stored score. Returns {profile_id: jobs rescored}.
+
+    Each stale job's stored text analysis (or, for rows without a current one,
+    the analysis computed here and written back) is read once and shared by
+    every profile; scores go to match_scores in bulk.
+
+    A profile whose fingerprint and the jobs watermark (WATERMARK_DDL) are
+    unchanged since its last committed refresh is skipped without a query.
+
+    Does not commit; the caller owns the transaction.
+    """
+    counts = {pid: 0 for pid in profiles}
+    version = _jobs_version(db)
+    url = str(db.get_bind().url)
+    fps = {pid: profile_fingerprint(skills, bullets) for pid, (skills, bullets) in profiles.items()}
+    with _fresh_lock:
+        todo = [pid for pid in profiles if version is None or _fresh.get((url, pid)) != (fps[pid], version)]
+    for g in range(0, len(todo), PROFILE_CHUNK):
+        group = {pid: profiles[pid] for pid in todo[g:g + PROFILE_CHUNK]}
+        group_fps = {pid: fps[pid] for pid in group}
+        with metrics.stage("ranking.stale_query"):
+            stale = _stale_pairs(db, group_fps)
+        job_ids = list(stale)
+        for i in range(0, len(job_ids), SCORE_CHUNK):
+            for pid, n in _score_chunk(db, group, group_fps, stale, job_ids[i:i + SCORE_CHUNK]).items():
+                counts[pid] += n
+    if version is not None and todo:
+        # the version read before the scan: anything written since bumps past it
+        db.info.setdefault(_PENDING, {}).update({(url, pid): (fps[pid], version) for pid in todo})
+    return counts
+
+
+def _score_chunk(
+    db: Session,
+    profiles: Dict[int, Tuple[List[str], List[str]]],
+    fps: Dict[int, str],
+    stale: Dict[int, List[Tuple[int, int]]],
+    job_ids: Sequence[int],
+) -> Dict[int, int]:
+    Job, MS = models.Job, models.MatchScore
+    with metrics.stage("ranking.load"):
+        rows = _analyzed(db, job_ids)
+
+    backfill: List[Dict] = []
+    hashes: List[str] = []
+    jds: List[JobAnalysis] = []
+    for row in rows:
+        jh = row.content_hash or content_hash(row.description)
+        hashes.append(jh)
+        if is_current(row) and row.content_hash is not None:
+            jds.append(get_analysis(row.id, jh, lambda: (row.normalized_text, split_keywords(row.keywords_csv))))
+            continue
+        # legacy rows, or analysis built with an older vocabulary
+        a = analyze_description(row.description)
+        backfill.append({"id": row.id, "content_hash": jh, **a})
+        jds.append(get_analysis(row.id, jh, lambda: (a["normalized_text"], split_keywords(a["keywords_csv"]))))
+
+    # only the profiles with something stale in this chunk
+    pids = sorted({pid for row in rows for pid, _ in stale[row.id]})
+    results = dict(zip(pids, score_matrix([profiles[pid] for pid in pids], jds)))
+
+    new_rows: List[Dict] = []
+    changed: List[Dict] = []
+    counts: Dict[int, int] = defaultdict(int)
+    for i, (row, jh) in enumerate(zip(rows, hashes)):
+        for pid, ms_id in stale[row.id]:
+            s, matched, missing = results[pid][i]
+            values = {
+                "score": s,
+                "matched_keywords": ",".join(matched),
+                "missing_keywords": ",".join(missing),
+                "profile_fingerprint": fps[pid],
+                "job_hash": jh,
+            }
+            if ms_id is None:
+                new_rows.append({"job_id": row.id, "profile_id": pid, **values})
+            else:
+                changed.append({"id": ms_id, **values})
+            counts[pid] += 1
+
+    # a concurrent /jobs/top may have scored the same job first; last writer wins
+    upsert = insert_on_conflict(MS, ["job_id", "profile_id"], update_cols=[
+        "score", "matched_keywords", "missing_keywords", "profile_fingerprint", "job_hash",
+    ])
+    with metrics.stage("ranking.write"):
+        for i in range(0, len(new_rows), WRITE_CHUNK):
+            db.execute(upsert, new_rows[i:i + WRITE_CHUNK])
+        for i in range(0, len(changed), WRITE_CHUNK):
+            db.execute(update(MS), changed[i:i + WRITE_CHUNK])
+        for i in range(0, len(backfill), WRITE_CHUNK):
+            db.execute(update(Job), backfill[i:i + WRITE_CHUNK])
+
+    return counts
+
+
+@metrics.timed("ranking.top")
+def top_scored_jobs(db: Session, profile_id: int, limit: int) -> List[models.Job]:
+    """Serve the ranking straight from stored match_scores."""
+    return (
+        db.query(models.Job)
+        .join(models.MatchScore, and_(
+            models.MatchScore.job_id == models.Job.id,
+            models.MatchScore.profile_id == profile_id,
+        ))
+        .filter(models.Job.is_active == True, models.Job.is_canonical.isnot(False))
+        .order_by(models.MatchScore.score.desc(), models.Job.id)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,193 @@
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Set
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.config import settings
+from app.ingest import archive_closed_jobs, sync_board, upsert_jobs
+from app.sources.engine import fetch_targets, target_spec
+from app.utils import utcnow
+
+
+# fetch outcomes that count as a successful refresh of the target
+FETCHED = ("ok", "not_modified", "unchanged")
+
+
+def refresh_targets(
+    db: Session,
+    targets: List[models.Target],
+    force: bool = False,
+    on_target: Optional[Callable[[schemas.TargetFetchOut], None]] = None,
+) -> schemas.RefreshOut:
+    """
+    Fetch `targets` concurrently and ingest what changed.
+
+    Boards that answer 304 or return the same body as last time are not
+    re-ingested, unless `force` drops the stored cache validators. Each target's
+    jobs and validators are committed together, so an interrupted run keeps
+    every board it finished and a rerun picks up the rest.
+
+    A board that returned a new listing is synced against the target's stored
+    jobs: postings no longer listed are deactivated, returning ones reactivated.
+    Failed, 304 and unchanged fetches leave the target's jobs as they are.
+
+    `on_target` is called with each target's report as soon as it is committed.
+    """
+    specs = [target_spec(t) for t in targets]
+    if force:
+        for s in specs:
+            s.update(etag=None, last_modified=None, body_hash=None)
+    results = fetch_targets(specs)
+    by_id = {t.id: t for t in targets}
+
+    inserted = updated = 0
+    report = []
+    for res in results:
+        t0 = time.monotonic()
+        t = by_id[res["target_id"]]
+        stats = {"inserted": 0, "updated": 0}
+        synced = {"deactivated": 0, "reactivated": 0}
+        if res["status"] == "ok":
+            stats = upsert_jobs(db, res["jobs"])
+            urls = {j["url"] for j in res["jobs"] if j.get("url")}
+            synced = sync_board(db, res["source"], res["company_token"], urls)
+        t.last_attempt_at = utcnow()
+        if res["status"] in FETCHED:
+            t.last_refreshed_at = t.last_attempt_at
+            t.failure_count = 0
+        else:
+            t.failure_count = (t.failure_count or 0) + 1
+        if res["cache"]:
+            t.etag = res["cache"]["etag"]
+            t.last_modified = res["cache"]["last_modified"]
+            t.body_hash = res["cache"]["body_hash"]
+        db.commit()
+        inserted += stats["inserted"]
+        updated += stats["updated"]
+        out = schemas.TargetFetchOut(
+            target_id=res["target_id"],
+            source=res["source"],
+            company_token=res["company_token"],
+            status=res["status"],
+            fetched=len(res["jobs"]),
+            inserted=stats["inserted"],
+            updated=stats["updated"],
+            deactivated=synced["deactivated"],
+            reactivated=synced["reactivated"],
+            error=res["error"],
+            elapsed_ms=res["elapsed_ms"],
+            ingest_ms=round((time.monotonic() - t0) * 1000, 1),
+        )
+        report.append(out)
+        if on_target:
+            on_target(out)
+
+    if settings.archive_closed_after_days > 0:
+        archive_closed_jobs(db, settings.archive_closed_after_days)
+        db.commit()
+    return schemas.RefreshOut(inserted=inserted, updated=updated, targets=report)
+
+
+def targets_needing_hydration(db: Session, limit: Optional[int] = None) -> List[models.Target]:
+    """
+    Greenhouse targets that still have active jobs never fetched in content
+    mode (description NULL; an empty posting fetched with content is "").
+    """
+    tokens = (
+        db.query(models.Job.company)
+        .filter(
+            models.Job.source == "greenhouse",
+            models.Job.is_active == True,
+            models.Job.description.is_(None),
+        )
+        .distinct()
+    )
+    q = (
+        db.query(models.Target)
+        .filter(models.Target.source == "greenhouse", models.Target.company_token.in_(tokens))
+        .order_by(models.Target.id)
+    )
+    if limit:
+        q = q.limit(limit)
+    return q.all()
+
+
+def retry_delay(failures: int) -> timedelta:
+    """Backoff after `failures` consecutive failed fetches: REFRESH_RETRY_MINUTES, doubling, capped."""
+    minutes = settings.refresh_retry_minutes * 2 ** min(max(failures - 1, 0), 20)
+    return timedelta(minutes=min(minutes, settings.refresh_retry_max_minutes))
+
+
+def claim_targets(db: Session, ids: Iterable[int], now: Optional[datetime] = None) -> Set[int]:
+    """
+    Claim targets for one refresh; returns the ids claimed. A target is only
+    claimed if no other refresh holds it, in any thread or process (several
+    API workers, a CLI run), so each board is fetched by one refresh at a time.
+
+    The claim is a lease stored on the row (claimed_until): release_targets()
+    ends it, and if the process dies first it expires after
+    settings.target_claim_minutes. Commits; targets already loaded in `db` are
+    reloaded in one query rather than one at a time.
+    """
+    ids = list(ids)
+    if not ids:
+        return set()
+    now = now or utcnow()
+    T = models.Target
+    claimed = set(db.execute(
+        update(T)
+        .where(T.id.in_(ids), or_(T.claimed_until.is_(None), T.claimed_until < now))
+        .values(claimed_until=now + timedelta(minutes=settings.target_claim_minutes))
+        .returning(T.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+    db.commit()
+    db.query(T).filter(T.id.in_(ids)).all()
+    return claimed
+
+
+def release_targets(db: Session, ids: Iterable[int]) -> None:
+    """End the claims taken by claim_targets(). Commits."""
+    ids = list(ids)
+    if not ids:
+        return
+    db.rollback()  # a refresh that raised may leave a failed transaction behind
+    T = models.Target
+    db.execute(
+        update(T).where(T.id.in_(ids)).values(claimed_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def targets_due(db: Session, now: Optional[datetime] = None) -> List[models.Target]:
+    """
+    Targets whose refresh interval has elapsed since their last successful
+    refresh (or that were never refreshed). A target's own
+    refresh_interval_minutes overrides settings.refresh_interval_minutes;
+    0 disables scheduling for it.
+
+    A target whose last fetch failed is due again only after retry_delay()
+    has passed since that attempt, so dead boards aren't refetched every tick.
+    Targets claimed by a running refresh (claim_targets) are left out.
+    """
+    now = now or utcnow()
+    due = []
+    for t in db.query(models.Target).order_by(models.Target.id).all():
+        if t.claimed_until is not None and t.claimed_until > now:
+            continue
+        minutes = t.refresh_interval_minutes
+        if minutes is None:
+            minutes = settings.refresh_interval_minutes
+        if minutes <= 0:
+            continue
+        if t.failure_count and t.last_attempt_at is not None:
+            if t.last_attempt_at <= now - retry_delay(t.failure_count):
+                due.append(t)
+            continue
+        if t.last_refreshed_at is None or t.last_refreshed_at <= now - timedelta(minutes=minutes):
+            due.append(t)
+    return due
@@ -0,0 +1,144 @@
+"""
+Resume PDF text extraction, kept off the event loop.
+
+extract_pdf_text() is blocking: call it from a worker thread (main.py uses
+run_in_threadpool). Small files are parsed in that thread; longer ones are split
+into page ranges extracted in parallel on a process pool, each worker opening
+its own reader over the bytes (pypdf readers are not safe to share, and page
+extraction is pure Python, so threads wouldn't run it in parallel). Nothing is
+written to disk. Results are cached by content hash, so uploading the same file
+again skips parsing.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from app import metrics
+from app.config import settings
+
+# Below this many pages the process hop costs more than it saves
+PARALLEL_MIN_PAGES = 8
+# Parsed texts kept in memory, by content hash
+CACHE_SIZE = 32
+
+
+class ResumeError(ValueError):
+    """The upload isn't a PDF we can (or are willing to) parse."""
+
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _read_errors() -> tuple:
+    """What pypdf raises on a broken file, while opening it or extracting a page."""
+    from pypdf.errors import PyPdfError
+
+    return (PyPdfError, ValueError, OSError)
+
+
+def _open(content: bytes):
+    """(reader, page count); pypdf is imported on first upload, not at app startup."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        return reader, len(reader.pages)
+    except _read_errors() as e:
+        raise ResumeError(f"Could not read PDF: {e}")
+
+
+def _extract_range(content: bytes, start: int, stop: int) -> List[str]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(content))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _workers() -> int:
+    return max(1, settings.resume_parse_workers or os.cpu_count() or 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process is multi-threaded and holds DB connections
+            _pool = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next upload starts a fresh one (unless another thread already has)."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pages(reader, content: bytes, n: int) -> List[str]:
+    workers = _workers()
+    if n >= PARALLEL_MIN_PAGES and workers > 1:
+        step = -(-n // workers)
+        pool = _get_pool()
+        try:
+            futures = [pool.submit(_extract_range, content, i, min(i + step, n)) for i in range(0, n, step)]
+        except (BrokenProcessPool, RuntimeError, OSError):
+            # the pool is broken (a worker died; its pipes may already be closed)
+            # or was shut down by another upload: replace it, finish this file here
+            _discard_pool(pool)
+        else:
+            try:
+                return [text for f in futures for text in f.result()]
+            except BrokenProcessPool:
+                # a worker died mid-file (killed, out of memory); pypdf errors pass through
+                _discard_pool(pool)
+    return [p.extract_text() or "" for p in reader.pages]
+
+
+def extract_pdf_text(content: bytes) -> str:
+    """Text of every page, in order. Raises ResumeError for unreadable or oversized input."""
+    if len(content) > settings.resume_max_bytes:
+        raise ResumeError(f"Resume is larger than {settings.resume_max_bytes} bytes")
+    key = hashlib.sha256(content).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    with metrics.stage("resume.parse"):
+        reader, n = _open(content)
+        if n > settings.resume_max_pages:
+            raise ResumeError(f"Resume has {n} pages; the limit is {settings.resume_max_pages}")
+
+        try:
+            pages = _extract_pages(reader, content, n)
+        except _read_errors() as e:
+            raise ResumeError(f"Could not read PDF: {e}")
+
+    text = "\n".join(pages).strip()
+    with _cache_lock:
+        _cache[key] = text
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return text
@@ -1,24 +1,34 @@
-from typing import List, Dict, Tuple
-from rapidfuzz import fuzz
+from typing import List, Dict, Tuple, Union
+from app import metrics
 from app.utils import normalize_text, extract_keywords
+from app.analysis import JobAnalysis, analyze_text
+from app.scoring import bullet_similarity_matrix
 
-def rank_truth_bullets(truth_bullets: List[str], jd_text: str) -> List[Tuple[int, str, float]]:
+@metrics.timed("rewrite.rank_bullets")
+def rank_truth_bullets(
+    truth_bullets: List[str], jd: Union[str, JobAnalysis]
+) -> List[Tuple[int, str, float]]:
     """
-    Returns bullets ranked by relevance to JD.
+    Returns bullets ranked by relevance to JD (raw text, or its JobAnalysis).
     Score uses:
-      - keyword hits from extract_keywords
+      - keyword hits against the JD's keywords
       - fuzzy match to JD
     """
-    jd = normalize_text(jd_text).lower()
-    jd_kws = extract_keywords(jd)
+    jd = analyze_text(jd)
+    jd_kws = jd.keywords
+
+    normed = [normalize_text(b) for b in (truth_bullets or [])]
+    if not normed:
+        return []
+    sims = bullet_similarity_matrix(normed, [jd.fuzzy_text])[:, 0]
 
     ranked = []
-    for i, b in enumerate(truth_bullets or []):
-        b_norm = normalize_text(b)
+    for i, b_norm in enumerate(normed):
         b_low = b_norm.lower()
 
-        kw_hits = sum(1 for k in jd_kws if k in b_low)
-        fuzzy = fuzz.token_set_ratio(b_low, jd) / 100.0  # 0..1
+        b_kws = set(extract_keywords(b_low))
+        kw_hits = sum(1 for k in jd_kws if k in b_kws)
+        fuzzy = float(sims[i]) / 100.0  # 0..1
 
         # Weighted score: keyword hits matter + fuzzy tie-breaker
         score = (kw_hits * 2.0) + (fuzzy * 3.0)
@@ -27,8 +37,12 @@ def rank_truth_bullets(truth_bullets: List[str], jd_text: str) -> List[Tuple[int
     ranked.sort(key=lambda x: x[2], reverse=True)
     return ranked
 
-def build_highlights(truth_bullets: List[str], jd_text: str, max_bullets: int = 10) -> List[str]:
-    ranked = rank_truth_bullets(truth_bullets, jd_text)
+def build_highlights(
+    truth_bullets: List[str],
+    jd: Union[str, JobAnalysis],
+    max_bullets: int = 10,
+) -> List[str]:
+    ranked = rank_truth_bullets(truth_bullets, jd)
     selected = [b for _, b, _ in ranked[:max_bullets]]
 
     # fallback if JD empty or nothing matches
@@ -36,7 +50,8 @@ def build_highlights(truth_bullets: List[str], jd_text: str, max_bullets: int =
         selected = [normalize_text(b) for b in truth_bullets[:max_bullets]]
     return selected
 
-def reorder_experience_sections(experiences: List[Dict], jd_text: str) -> List[Dict]:
+@metrics.timed("rewrite.reorder_experience")
+def reorder_experience_sections(experiences: List[Dict], jd: Union[str, JobAnalysis]) -> List[Dict]:
     """
     experiences = list of dicts like:
       { "company": "...", "role": "...", "bullets": [...] }
@@ -44,14 +59,18 @@ def reorder_experience_sections(experiences: List[Dict], jd_text: str) -> List[D
     We rank each experience by how relevant its bullets are to JD,
     then reorder experiences descending (most relevant first).
     """
-    jd = normalize_text(jd_text).lower()
-    scored = []
+    jd = analyze_text(jd)
 
+    # one similarity column for every bullet of every experience
+    flat = [(b or "") for exp in experiences for b in (exp.get("bullets", []) or [])]
+    sims = bullet_similarity_matrix(flat, [jd.fuzzy_text])[:, 0] if flat else []
+
+    scored = []
+    pos = 0
     for exp in experiences:
-        bullets = exp.get("bullets", []) or []
-        best = 0
-        for b in bullets:
-            best = max(best, fuzz.token_set_ratio((b or "").lower(), jd))
+        n = len(exp.get("bullets", []) or [])
+        best = max(sims[pos:pos + n], default=0)
+        pos += n
         scored.append((best, exp))
 
     scored.sort(key=lambda x: x[0], reverse=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 class ProfileIn(BaseModel):
     full_name: str
@@ -18,9 +18,59 @@ class ProfileOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ScoreRefreshIn(BaseModel):
+    profile_ids: List[int] = Field(default_factory=list)   # empty = every profile
+
+class ScoreRefreshOut(BaseModel):
+    rescored: Dict[int, int] = Field(default_factory=dict)  # profile id -> jobs rescored
+
 class TargetIn(BaseModel):
     company_token: str
     display_name: Optional[str] = None
+    refresh_interval_minutes: Optional[int] = None   # None = REFRESH_INTERVAL_MINUTES, 0 = never
+
+class TargetFetchOut(BaseModel):
+    target_id: int
+    source: str
+    company_token: str
+    status: str                 # ok / not_modified / unchanged / failed / timeout / skipped
+    fetched: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0        # no longer listed on the board
+    reactivated: int = 0        # listed again after being deactivated
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0     # fetch time
+    ingest_ms: float = 0.0      # upsert + commit time
+
+class RefreshOut(BaseModel):
+    inserted: int
+    updated: int = 0
+    targets: List[TargetFetchOut] = Field(default_factory=list)
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportOut(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
+
+class TaskOut(BaseModel):
+    id: str
+    kind: str
+    status: str                 # queued / running / done / failed
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress_done: int = 0
+    progress_total: int = 0
+    targets: List[TargetFetchOut] = Field(default_factory=list)
+    result: Optional[dict] = None
+    error: Optional[str] = None
 
 class JobOut(BaseModel):
     id: int
@@ -29,9 +79,18 @@ class JobOut(BaseModel):
     title: str
     location: Optional[str]
     url: str
+    cluster_id: Optional[int] = None    # shared by near-duplicate postings (app/dedupe.py)
     class Config:
         from_attributes = True
 
+class JobSearchHit(JobOut):
+    rank: float                 # bm25; lower is better
+    snippet: Optional[str] = None
+
+class JobSearchOut(BaseModel):
+    results: List[JobSearchHit] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
 class PacketOut(BaseModel):
     job_id: int
     packet_path: str
@@ -39,3 +98,23 @@ class PacketOut(BaseModel):
     cover_letter: str
     recruiter_message: str
     match_report: str
+    cached: bool = False        # an identical packet already existed and was returned as is
+
+class PacketBatchIn(BaseModel):
+    job_ids: List[int] = Field(default_factory=list)
+    top: Optional[int] = None           # or: the top N jobs by score (at most PACKETS_BATCH_MAX)
+    workers: Optional[int] = None       # processes to use (at most PACKET_WORKERS / cpu count)
+    profile_id: Optional[int] = None    # default: the first profile
+
+class PacketResult(BaseModel):
+    job_id: int
+    ok: bool
+    packet: Optional[PacketOut] = None
+    error: Optional[str] = None
+    duplicate_of: Optional[int] = None  # near-duplicate of this job; its packet is built instead
+
+class PacketBatchOut(BaseModel):
+    generated: int
+    failed: int
+    duplicates: int = 0
+    results: List[PacketResult] = Field(default_factory=list)
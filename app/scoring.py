@@ -1,27 +1,118 @@
-from typing import List, Tuple
-from rapidfuzz import fuzz
-from app.utils import extract_keywords, normalize_text
+from typing import TYPE_CHECKING, List, Sequence, Set, Tuple
+from app import metrics
+from app.config import settings
+from app.utils import normalize_skill, content_hash
+from app.keywords import vocab_version
+from app.analysis import JobAnalysis, analyze_text
 
-def score_job(profile_skills: List[str], truth_bullets: List[str], jd_text: str) -> Tuple[float, List[str], List[str]]:
-    jd = normalize_text(jd_text).lower()
-    jd_keywords = extract_keywords(jd)
+if TYPE_CHECKING:
+    import numpy as np
+
+# Bump when score_job's formula changes so cached match_scores get recomputed
+SCORING_VERSION = "1"
+
+def profile_fingerprint(profile_skills: List[str], truth_bullets: List[str]) -> str:
+    """Hash of everything on the profile side that feeds score_job."""
+    return content_hash(
+        SCORING_VERSION,
+        vocab_version(),
+        "\n".join(profile_skills or []),
+        "\n".join(truth_bullets or []),
+    )
+
+def bullet_similarity_matrix(truth_bullets: List[str], jds: Sequence[str], workers: int = 1) -> "np.ndarray":
+    """
+    bullets x jobs matrix of token_set_ratio (0..100), computed in one native call.
+    `jds` are JobAnalysis.fuzzy_text strings (any normalized + lowercased text
+    works). workers=-1 uses every core.
+    """
+    # numpy/rapidfuzz load on first scoring call, not at app startup
+    import numpy as np
+    from rapidfuzz import fuzz, process
 
-    prof = [s.lower().strip() for s in (profile_skills or []) if s.strip()]
-    prof_set = set(prof)
+    # cdist preprocesses each query once, so the long JDs go on the query side
+    # (several times faster than bullets-as-queries) and the result is transposed.
+    return process.cdist(
+        jds,
+        [b.lower() for b in truth_bullets],
+        scorer=fuzz.token_set_ratio,
+        dtype=np.float64,
+        workers=workers,
+    ).T
 
+def _keyword_part(prof_set: Set[str], jd_keywords: Sequence[str]) -> Tuple[float, List[str], List[str]]:
     matched = [k for k in jd_keywords if k in prof_set]
     missing = [k for k in jd_keywords if k not in prof_set]
 
     keyword_score = 0.0
     if jd_keywords:
         keyword_score = len(matched) / len(jd_keywords) * 70.0  # up to 70
+    return keyword_score, matched, missing
+
+def score_matrix(
+    profiles: Sequence[Tuple[List[str], List[str]]],
+    jds: Sequence[JobAnalysis],
+    workers: int = None,
+) -> List[List[Tuple[float, List[str], List[str]]]]:
+    """
+    profiles x jobs scores over analyzed JDs (see app/analysis.py): one list of
+    results per (skills, truth_bullets) profile, each with one result per JD.
+
+    The bullet fuzzy part for every profile comes from a single bullets x jobs
+    similarity matrix over the union of all profiles' bullets, so each JD is
+    preprocessed once no matter how many profiles are scored against it.
+    """
+    workers = settings.score_workers if workers is None else workers
+
+    # each distinct bullet is one matrix row, shared by the profiles that have it
+    row_of = {}
+    for _, bullets in profiles:
+        for b in bullets or []:
+            row_of.setdefault(b, len(row_of))
+    sims = None
+    if row_of and jds:
+        with metrics.stage("score.fuzzy"):
+            sims = bullet_similarity_matrix(list(row_of), [a.fuzzy_text for a in jds], workers=workers)
 
-    bullet_score = 0.0
-    if truth_bullets:
-        best = 0
-        for b in truth_bullets:
-            best = max(best, fuzz.token_set_ratio(b.lower(), jd))
-        bullet_score = (best / 100.0) * 30.0  # up to 30
+    out = []
+    with metrics.stage("score.keywords"):
+        for skills, bullets in profiles:
+            prof_set = {normalize_skill(s) for s in (skills or []) if s.strip()}
+            best = None
+            if sims is not None and bullets:
+                best = sims[[row_of[b] for b in bullets]].max(axis=0)
 
-    total = round(keyword_score + bullet_score, 2)
-    return total, matched, missing
+            results = []
+            for i, a in enumerate(jds):
+                keyword_score, matched, missing = _keyword_part(prof_set, a.keywords)
+
+                bullet_score = 0.0
+                if best is not None:
+                    bullet_score = (float(best[i]) / 100.0) * 30.0  # up to 30
+
+                total = round(keyword_score + bullet_score, 2)
+                results.append((total, matched, missing))
+            out.append(results)
+    metrics.JOBS_SCORED.inc(len(profiles) * len(jds))
+    return out
+
+def score_analyzed(
+    profile_skills: List[str],
+    truth_bullets: List[str],
+    jds: Sequence[JobAnalysis],
+    workers: int = None,
+) -> List[Tuple[float, List[str], List[str]]]:
+    """score_matrix for a single profile: one result per JD."""
+    return score_matrix([(profile_skills, truth_bullets)], jds, workers=workers)[0]
+
+def score_jobs(
+    profile_skills: List[str],
+    truth_bullets: List[str],
+    jd_texts: Sequence[str],
+    workers: int = None,
+) -> List[Tuple[float, List[str], List[str]]]:
+    """Batched score_job over raw JD texts: one result per JD, same formula."""
+    return score_analyzed(profile_skills, truth_bullets, [analyze_text(t) for t in jd_texts], workers=workers)
+
+def score_job(profile_skills: List[str], truth_bullets: List[str], jd_text: str) -> Tuple[float, List[str], List[str]]:
+    return score_jobs(profile_skills, truth_bullets, [jd_text], workers=1)[0]
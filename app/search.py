@@ -0,0 +1,141 @@
+import base64
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# External-content FTS5 index over jobs. Triggers keep it in sync with every
+# insert/update/delete on jobs, whichever ingestion path wrote the row.
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, location, description,
+        content='jobs', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, company, location, description)
+        VALUES (new.id, new.title, new.company, new.location, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, location, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+        INSERT INTO jobs_fts(rowid, title, company, location, description)
+        VALUES (new.id, new.title, new.company, new.location, new.description);
+    END
+    """,
+]
+
+# bm25 column weights: title, company, location, description
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(conn: Connection) -> None:
+    """Create the FTS table and triggers if missing; backfill from jobs when newly created."""
+    if not search_supported(conn):
+        return
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='jobs_fts'")
+    ).first()
+    for ddl in FTS_DDL:
+        conn.execute(text(ddl))
+    if not exists:
+        conn.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+
+
+def to_match_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match (implicit AND),
+    quoted so user input can't inject FTS syntax. The last word also matches as
+    a prefix, which suits search-as-you-type.
+    """
+    terms = _TERM_RE.findall(q or "")
+    if not terms:
+        return ""
+    parts = ['"%s"' % t for t in terms[:-1]]
+    parts.append('"%s"*' % terms[-1])
+    return " ".join(parts)
+
+
+def encode_cursor(rank: float, job_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}:{job_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    rank, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+    return float(rank), int(job_id)
+
+
+def search_jobs(
+    db: Session,
+    q: str,
+    limit: int = 25,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    location: Optional[str] = None,
+    is_active: Optional[bool] = True,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    BM25-ranked search over title/company/location/description, answered from
+    the FTS index. Pages are keyset-paginated on (rank, id): pass the returned
+    cursor to get the next page. Returns (hits, next_cursor).
+    """
+    match = to_match_query(q)
+    if not match:
+        return [], None
+
+    where = ["jobs_fts MATCH :match"]
+    params: Dict = {"match": match, "limit": limit + 1}
+    if source:
+        where.append("j.source = :source")
+        params["source"] = source
+    if location:
+        where.append("j.location LIKE :location")
+        params["location"] = f"%{location}%"
+    if is_active is not None:
+        where.append("j.is_active = :is_active")
+        params["is_active"] = is_active
+
+    page = ""
+    if cursor:
+        params["c_rank"], params["c_id"] = decode_cursor(cursor)
+        page = "WHERE rank > :c_rank OR (rank = :c_rank AND id > :c_id)"
+
+    sql = f"""
+        SELECT * FROM (
+            SELECT j.id, j.source, j.company, j.title, j.location, j.url,
+                   bm25(jobs_fts, {", ".join(str(w) for w in BM25_WEIGHTS)}) AS rank,
+                   snippet(jobs_fts, 3, '[', ']', '…', 16) AS snippet
+            FROM jobs_fts
+            JOIN jobs j ON j.id = jobs_fts.rowid
+            WHERE {" AND ".join(where)}
+        )
+        {page}
+        ORDER BY rank, id
+        LIMIT :limit
+    """
+    rows = [dict(r._mapping) for r in db.execute(text(sql), params)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+    return rows, next_cursor
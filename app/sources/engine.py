@@ -0,0 +1,144 @@
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app import metrics
+from app.config import settings
+from app.sources import greenhouse, lever
+from app.sources.http import get_session
+
+# source -> (board url builder, payload parser)
+SOURCES: Dict[str, Tuple[Callable[[str], str], Callable[[Any, str], List[Dict]]]] = {
+    "greenhouse": (greenhouse.board_url, greenhouse.parse_jobs),
+    "lever": (lever.board_url, lever.parse_jobs),
+}
+
+
+def target_spec(t) -> Dict:
+    """Plain-dict snapshot of a Target row (ORM objects must not cross threads)."""
+    return {
+        "id": t.id,
+        "source": t.source,
+        "company_token": t.company_token,
+        "etag": t.etag,
+        "last_modified": t.last_modified,
+        "body_hash": t.body_hash,
+    }
+
+
+def _fetch_one(spec: Dict, timeout: float, started: Dict[int, float]) -> Dict:
+    """
+    Conditional GET of one board. Returns a partial result:
+      not_modified  - server answered 304 to our ETag / Last-Modified
+      unchanged     - 200, but the body hashes the same as last time
+      ok            - new content, parsed into jobs
+    In the first two cases nothing is parsed.
+    """
+    started[spec["id"]] = time.monotonic()
+    url_for, parse = SOURCES[spec["source"]]
+
+    headers = {}
+    if spec.get("etag"):
+        headers["If-None-Match"] = spec["etag"]
+    if spec.get("last_modified"):
+        headers["If-Modified-Since"] = spec["last_modified"]
+
+    with metrics.stage("fetch.http"):
+        r = get_session().get(url_for(spec["company_token"]), headers=headers, timeout=timeout)
+    if r.status_code == 304:
+        return {"status": "not_modified", "jobs": [], "cache": None}
+    r.raise_for_status()
+
+    cache = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "body_hash": hashlib.sha1(r.content).hexdigest(),
+    }
+    if cache["body_hash"] == spec.get("body_hash"):
+        return {"status": "unchanged", "jobs": [], "cache": cache}
+    with metrics.stage("fetch.parse"):
+        jobs = parse(r.json(), spec["company_token"])
+    return {"status": "ok", "jobs": jobs, "cache": cache}
+
+
+def _result(spec: Dict, status: str, jobs: Optional[List[Dict]] = None,
+            error: Optional[str] = None, elapsed: float = 0.0,
+            cache: Optional[Dict] = None) -> Dict:
+    metrics.FETCHES.inc(source=spec["source"], outcome=status)
+    if status != "skipped":
+        metrics.FETCH_SECONDS.observe(elapsed, source=spec["source"])
+    return {
+        "target_id": spec["id"],
+        "source": spec["source"],
+        "company_token": spec["company_token"],
+        "status": status,            # ok / not_modified / unchanged / failed / timeout / skipped
+        "jobs": jobs or [],
+        "cache": cache,              # new validators to store on the Target, if any
+        "error": error,
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+
+def fetch_targets(
+    targets: List[Dict],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[Dict]:
+    """
+    Fetch every target (see target_spec) concurrently on a bounded thread pool.
+
+    `timeout` is a wall-clock budget per target (measured from when its fetch
+    starts, not from when it was queued). It is also passed to requests as the
+    socket timeout. A target that exceeds it is reported as "timeout" and its
+    result is discarded, so one slow board can't hold up the rest.
+
+    Returns one result dict per target, in input order.
+    """
+    from requests import Timeout  # loaded on first refresh, not at app startup
+
+    workers = workers or settings.fetch_workers
+    timeout = timeout or settings.fetch_timeout
+
+    results: Dict[int, Dict] = {}
+    runnable = []
+    for spec in targets:
+        if spec["source"] in SOURCES:
+            runnable.append(spec)
+        else:
+            results[spec["id"]] = _result(spec, "skipped", error=f"Unknown source '{spec['source']}'")
+
+    started: Dict[int, float] = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(runnable) or 1)))
+    try:
+        pending = {pool.submit(_fetch_one, spec, timeout, started): spec for spec in runnable}
+        while pending:
+            done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for fut in done:
+                spec = pending.pop(fut)
+                elapsed = now - started.get(spec["id"], now)
+                try:
+                    res = fut.result()
+                    results[spec["id"]] = _result(
+                        spec, res["status"], jobs=res["jobs"], cache=res["cache"], elapsed=elapsed
+                    )
+                except Timeout as e:
+                    results[spec["id"]] = _result(spec, "timeout", error=str(e), elapsed=elapsed)
+                except Exception as e:
+                    results[spec["id"]] = _result(spec, "failed", error=str(e), elapsed=elapsed)
+
+            # enforce the per-target wall-clock budget on fetches still running
+            for fut, spec in list(pending.items()):
+                t0 = started.get(spec["id"])
+                if t0 is not None and now - t0 > timeout:
+                    fut.cancel()
+                    pending.pop(fut)
+                    results[spec["id"]] = _result(
+                        spec, "timeout", error=f"Exceeded {timeout}s", elapsed=now - t0
+                    )
+    finally:
+        # don't block on abandoned fetches; their sockets time out on their own
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return [results[spec["id"]] for spec in targets]
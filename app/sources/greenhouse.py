@@ -1,11 +1,17 @@
-import requests
-from typing import List, Dict
+from typing import TYPE_CHECKING, Any, List, Dict, Optional
+from app.config import settings
+from app.utils import html_to_text
+from app.sources.http import get_session
 
-def fetch_greenhouse_jobs(company_token: str) -> List[Dict]:
-    url = f"https://boards-api.greenhouse.io/v1/boards/{company_token}/jobs"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    data = r.json()
+if TYPE_CHECKING:
+    import requests
+
+def board_url(company_token: str) -> str:
+    # content=true returns every posting's description in the same response,
+    # so the board is hydrated in one request instead of one per job
+    return f"{settings.greenhouse_api_base}/v1/boards/{company_token}/jobs?content=true"
+
+def parse_jobs(data: Any, company_token: str) -> List[Dict]:
     jobs = []
     for j in data.get("jobs", []):
         jobs.append({
@@ -14,7 +20,19 @@ def fetch_greenhouse_jobs(company_token: str) -> List[Dict]:
             "title": j.get("title") or "",
             "location": (j.get("location") or {}).get("name"),
             "url": j.get("absolute_url") or "",
-            "department": None,
-            "description": None,
+            "department": ((j.get("departments") or [{}])[0] or {}).get("name"),
+            # None only when the response had no content field (so ingestion never
+            # blanks a stored description); a content-mode posting that is genuinely
+            # empty is stored as "", which takes it out of the /jobs/hydrate set
+            "description": html_to_text(j["content"] or "") if "content" in j else None,
         })
     return jobs
+
+def fetch_greenhouse_jobs(
+    company_token: str,
+    session: Optional["requests.Session"] = None,
+    timeout: float = 30,
+) -> List[Dict]:
+    r = (session or get_session()).get(board_url(company_token), timeout=timeout)
+    r.raise_for_status()
+    return parse_jobs(r.json(), company_token)
@@ -0,0 +1,36 @@
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import requests
+
+_session: Optional["requests.Session"] = None
+_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """
+    Shared keep-alive session for all board fetches.
+    The connection pool is sized to the fetch worker count so concurrent
+    targets on the same host reuse sockets instead of reconnecting.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                # imported on first fetch, not at app startup
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                s = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.fetch_workers,
+                    pool_maxsize=settings.fetch_workers,
+                )
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers.update({"User-Agent": settings.app_name})
+                _session = s
+    return _session
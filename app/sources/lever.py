@@ -1,11 +1,14 @@
-import requests
-from typing import List, Dict
+from typing import TYPE_CHECKING, Any, List, Dict, Optional
+from app.config import settings
+from app.sources.http import get_session
 
-def fetch_lever_jobs(company_token: str) -> List[Dict]:
-    url = f"https://api.lever.co/v0/postings/{company_token}?mode=json"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    arr = r.json()
+if TYPE_CHECKING:
+    import requests
+
+def board_url(company_token: str) -> str:
+    return f"{settings.lever_api_base}/v0/postings/{company_token}?mode=json"
+
+def parse_jobs(arr: Any, company_token: str) -> List[Dict]:
     jobs = []
     for j in arr:
         jobs.append({
@@ -18,3 +21,12 @@ def fetch_lever_jobs(company_token: str) -> List[Dict]:
             "description": j.get("descriptionPlain") or j.get("description") or "",
         })
     return jobs
+
+def fetch_lever_jobs(
+    company_token: str,
+    session: Optional["requests.Session"] = None,
+    timeout: float = 30,
+) -> List[Dict]:
+    r = (session or get_session()).get(board_url(company_token), timeout=timeout)
+    r.raise_for_status()
+    return parse_jobs(r.json(), company_token)
@@ -1,20 +1,21 @@
 from typing import Dict
-from app.utils import extract_keywords
+from app.utils import normalize_skill
+from app.analysis import analyze_job
 from app.rewriter import build_highlights
 
 
 def build_tailored_resume_content(profile: Dict, job: Dict) -> Dict:
-    jd_text = job.get("description", "") or ""
+    # Built from the analysis stored on the job at ingest, once per process (app/analysis.py)
+    jd = analyze_job(job)
 
     # Ranked, truth-locked highlights (derived from truth bullets vs JD)
     highlights = build_highlights(
         profile.get("truth_bullets", []) or [],
-        jd_text,
+        jd,
         max_bullets=10,
     )
 
-    jd_keywords = extract_keywords(jd_text)
-    prof_skills = [s.lower() for s in (profile.get("skills", []) or [])]
+    prof_skills = {normalize_skill(s) for s in (profile.get("skills", []) or [])}
 
     return {
         "full_name": profile.get("full_name", ""),
@@ -30,6 +31,6 @@ def build_tailored_resume_content(profile: Dict, job: Dict) -> Dict:
 
         "job_title": job.get("title", ""),
         "company": job.get("company", ""),
-        "matched_keywords": [k for k in jd_keywords if k in prof_skills],
-        "missing_keywords": [k for k in jd_keywords if k not in prof_skills],
+        "matched_keywords": [k for k in jd.keywords if k in prof_skills],
+        "missing_keywords": [k for k in jd.keywords if k not in prof_skills],
     }
@@ -0,0 +1,221 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+from app import models, schemas
+from app.config import settings
+from app.db import SessionLocal
+from app.refresh import claim_targets, refresh_targets, release_targets, targets_due
+
+log = logging.getLogger(__name__)
+
+
+class Task:
+    """One unit of background work and its live progress, as reported by GET /tasks/{id}."""
+
+    def __init__(self, kind: str, key: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"          # queued / running / done / failed
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress_done = 0
+        self.progress_total = 0
+        self.targets: List[schemas.TargetFetchOut] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def to_out(self) -> schemas.TaskOut:
+        with self.lock:
+            return schemas.TaskOut(
+                id=self.id,
+                kind=self.kind,
+                status=self.status,
+                created_at=self.created_at,
+                started_at=self.started_at,
+                finished_at=self.finished_at,
+                progress_done=self.progress_done,
+                progress_total=self.progress_total,
+                targets=list(self.targets),
+                result=self.result,
+                error=self.error,
+            )
+
+
+class TaskManager:
+    """
+    In-process background work: a FIFO queue drained by a small pool of worker
+    threads, plus a scheduler thread that queues refreshes for targets whose
+    interval has elapsed.
+
+    Two guards keep refreshes from doing the same work twice:
+      - submit() with a `key` that is already queued/running returns that task
+        instead of queueing another one;
+      - each target is claimed by one running refresh at a time, in the
+        database (app/refresh.py claim_targets), so the claim holds across
+        every API worker process and the CLI; a refresh that finds a target
+        claimed reports it as "busy" and moves on.
+
+    With several worker processes each runs its own scheduler; they may queue
+    the same due target, but only one of them claims and fetches it.
+    """
+
+    def __init__(self, workers: int = 2, history: int = 500):
+        self.workers = max(1, workers)
+        self.history = history
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._tasks: "OrderedDict[str, Task]" = OrderedDict()
+        self._active: Dict[str, Task] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    # lifecycle
+
+    def start(self, scheduler: bool = False) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                th = threading.Thread(target=self._work, name=f"task-worker-{i}", daemon=True)
+                th.start()
+                self._threads.append(th)
+            if scheduler:
+                th = threading.Thread(target=self._schedule, name="task-scheduler", daemon=True)
+                th.start()
+                self._threads.append(th)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stop.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for th in threads:
+            th.join(timeout)
+
+    # tasks
+
+    def submit(self, kind: str, fn: Callable[[Task], Optional[dict]], key: Optional[str] = None) -> Task:
+        """Queue fn(task); with a key, an identical task already in flight is returned instead."""
+        self.start()
+        with self._lock:
+            if key and key in self._active:
+                return self._active[key]
+            task = Task(kind, key)
+            self._tasks[task.id] = task
+            if key:
+                self._active[key] = task
+            while len(self._tasks) > self.history:
+                old_id, old = next(iter(self._tasks.items()))
+                if old.status in ("queued", "running"):
+                    break
+                del self._tasks[old_id]
+        self._queue.put((task, fn))
+        return task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def list(self, limit: int = 50) -> List[Task]:
+        with self._lock:
+            return list(reversed(self._tasks.values()))[:limit]
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            task, fn = item
+            with task.lock:
+                task.status = "running"
+                task.started_at = time.time()
+            try:
+                result = fn(task)
+                with task.lock:
+                    task.result = result
+                    task.status = "done"
+            except Exception as e:
+                with task.lock:
+                    task.error = str(e)
+                    task.status = "failed"
+            finally:
+                with task.lock:
+                    task.finished_at = time.time()
+                with self._lock:
+                    if task.key and self._active.get(task.key) is task:
+                        del self._active[task.key]
+
+    # refreshes
+
+    def submit_refresh(self, target_ids: Optional[List[int]] = None, kind: str = "refresh",
+                       key: Optional[str] = None) -> Task:
+        """Refresh the given targets (all targets if None) in the background."""
+        if key is None:
+            key = kind if target_ids is None else f"{kind}:" + ",".join(map(str, sorted(target_ids)))
+        return self.submit(kind, lambda task: self._run_refresh(task, target_ids), key=key)
+
+    def _run_refresh(self, task: Task, target_ids: Optional[List[int]]) -> dict:
+        db = SessionLocal()
+        claimed: Set[int] = set()
+        try:
+            q = db.query(models.Target).order_by(models.Target.id)
+            if target_ids is not None:
+                q = q.filter(models.Target.id.in_(target_ids))
+            targets = q.all()
+            claimed = claim_targets(db, [t.id for t in targets])
+
+            with task.lock:
+                task.progress_total = len(targets)
+                for t in targets:
+                    if t.id not in claimed:
+                        task.targets.append(schemas.TargetFetchOut(
+                            target_id=t.id, source=t.source, company_token=t.company_token,
+                            status="busy", error="Already being refreshed by another task",
+                        ))
+                        task.progress_done += 1
+
+            def on_target(out: schemas.TargetFetchOut) -> None:
+                with task.lock:
+                    task.targets.append(out)
+                    task.progress_done += 1
+
+            out = refresh_targets(db, [t for t in targets if t.id in claimed], on_target=on_target)
+            return {
+                "inserted": out.inserted,
+                "updated": out.updated,
+                "deactivated": sum(t.deactivated for t in out.targets),
+                "reactivated": sum(t.reactivated for t in out.targets),
+            }
+        finally:
+            try:
+                release_targets(db, claimed)
+            finally:
+                db.close()
+
+    def _schedule(self) -> None:
+        while not self._stop.wait(settings.scheduler_tick_seconds):
+            try:
+                db = SessionLocal()
+                try:
+                    due = [t.id for t in targets_due(db)]
+                finally:
+                    db.close()
+                if due:
+                    # one scheduled refresh in flight at a time; later ticks pick up what's still due
+                    self.submit_refresh(due, kind="scheduled_refresh", key="scheduled_refresh")
+            except Exception:
+                # a bad tick (e.g. DB locked past busy_timeout) just waits for the next one
+                log.exception("scheduler tick failed")
+
+
+manager = TaskManager(workers=settings.task_workers, history=settings.task_history)
@@ -0,0 +1,85 @@
+"""
+{{KEY}} templates for packet text (cover letter, recruiter message).
+
+A template is parsed once into literal and placeholder segments and rendered
+in a single pass, so each value is inserted exactly once (a value that itself
+contains "{{...}}" is not expanded again). Templates read from disk are cached
+by path and mtime, so a batch of packets parses each file once.
+"""
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+class TemplateError(ValueError):
+    """A template references keys the render data doesn't provide."""
+
+
+class Template:
+    def __init__(self, source: str, name: str = "<string>"):
+        self.source = source
+        self.name = name
+        self.digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        # literals[i] precedes keys[i]; literals has one more item than keys
+        parts = _PLACEHOLDER_RE.split(source)
+        self.literals: List[str] = parts[0::2]
+        self.keys: List[str] = parts[1::2]
+        self.fields: FrozenSet[str] = frozenset(self.keys)
+
+    def missing(self, data: Dict[str, Any]) -> List[str]:
+        return sorted(self.fields.difference(data))
+
+    def render(self, data: Dict[str, Any], strict: bool = True) -> str:
+        """
+        Fill every placeholder from `data`. A key missing from `data` raises
+        TemplateError, or with strict=False is left in the output as "{{KEY}}".
+        """
+        if not self.fields.issubset(data):
+            if strict:
+                raise TemplateError(
+                    f"{self.name}: no value for " + ", ".join("{{%s}}" % k for k in self.missing(data))
+                )
+            data = {**{k: "{{%s}}" % k for k in self.fields}, **data}
+        out = [self.literals[0]]
+        for key, literal in zip(self.keys, self.literals[1:]):
+            out.append(str(data[key]))
+            out.append(literal)
+        return "".join(out)
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str, name: str = "<string>") -> Template:
+    return Template(source, name)
+
+
+# path -> ((mtime_ns, size), Template)
+_files: Dict[str, Tuple[Tuple[int, int], Template]] = {}
+_files_lock = threading.Lock()
+
+
+def load_template(path: str, default: Optional[str] = None) -> Template:
+    """
+    The compiled template at `path`, reparsed only when the file's mtime or
+    size changes. Falls back to `default` when the file doesn't exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        if default is None:
+            raise
+        return compile_template(default, os.path.basename(path))
+    sig = (st.st_mtime_ns, st.st_size)
+    with _files_lock:
+        cached = _files.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        tpl = Template(f.read(), os.path.basename(path))
+    with _files_lock:
+        _files[path] = (sig, tpl)
+    return tpl
@@ -1,29 +1,52 @@
 import re
+import html
+import hashlib
+from datetime import datetime, timezone
 from typing import List, Dict, Any
+from app import metrics
+from app.keywords import get_matcher
+from app.templating import compile_template
 
 def normalize_text(t: str) -> str:
     t = t or ""
     t = re.sub(r"\s+", " ", t).strip()
     return t
 
+_SCRIPT_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+_BLOCK_RE = re.compile(r"<\s*(br|/p|/div|/li|/ul|/ol|/h[1-6]|/tr)\b[^>]*>", re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+def html_to_text(s: str) -> str:
+    # Greenhouse "content" is entity-escaped HTML, so unescape before stripping tags
+    if not s:
+        return ""
+    s = html.unescape(s)
+    s = _SCRIPT_RE.sub(" ", s)
+    s = _BLOCK_RE.sub("\n", s)
+    s = _TAG_RE.sub(" ", s)
+    s = html.unescape(s)
+    lines = [normalize_text(line) for line in s.splitlines()]
+    return "\n".join(line for line in lines if line)
+
 def extract_keywords(text: str) -> List[str]:
-    text = (text or "").lower()
-    tools = [
-        "databricks","spark","python","sql","snowflake","azure","aws","gcp","synapse",
-        "adf","airflow","dbt","kafka","hadoop","tableau","power bi","kibana","elasticsearch",
-        "terraform","docker","kubernetes","delta lake","pyspark","scala","java","git",
-        "fastapi","sqlalchemy","nifi","opensearch","s3","blob storage","lakehouse","druid"
-    ]
-    found = []
-    for k in tools:
-        if k in text:
-            found.append(k)
-    seen = set()
-    out = []
-    for x in found:
-        if x not in seen:
-            out.append(x); seen.add(x)
-    return out
+    # Token-bounded vocabulary match, see app/keywords.py
+    with metrics.stage("keywords.extract"):
+        return get_matcher().extract(text)
+
+def normalize_skill(skill: str) -> str:
+    # Canonical vocabulary name for a profile skill, so aliases line up with JD keywords
+    return get_matcher().canonical(skill)
+
+def content_hash(*parts: str) -> str:
+    h = hashlib.sha1()
+    for p in parts:
+        h.update((p or "").encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+def utcnow() -> datetime:
+    # naive UTC, matching how SQLite stores DateTime columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 def safe_slug(s: str, max_len: int = 60) -> str:
     s = (s or "").strip()
@@ -32,8 +55,5 @@ def safe_slug(s: str, max_len: int = 60) -> str:
     return s.replace(" ", "_")
 
 def render_template(template: str, data: Dict[str, Any]) -> str:
-    # Minimal templating: {{KEY}} replacements
-    out = template
-    for k, v in data.items():
-        out = out.replace("{{" + k + "}}", str(v))
-    return out
+    # {{KEY}} replacements in one pass (app/templating.py); unknown keys are left as is
+    return compile_template(template).render(data, strict=False)
@@ -0,0 +1,135 @@
+"""
+Local stand-ins for the Greenhouse and Lever board APIs, served over real HTTP
+so refresh benchmarks exercise the whole fetch path (pool, timeouts, conditional
+requests) without touching the network.
+
+Point the app at it with GREENHOUSE_API_BASE / LEVER_API_BASE = FakeBoards.base_url.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from bench.corpus import greenhouse_payload, lever_payload
+
+_GREENHOUSE_RE = re.compile(r"^/v1/boards/([^/?]+)/jobs")
+_LEVER_RE = re.compile(r"^/v0/postings/([^/?]+)")
+
+
+class FakeBoards:
+    """
+    Serves every board token with `jobs_per_board` postings.
+
+    latency_ms / jitter_ms  - delay added to every response
+    failure_rate            - share of tokens that always answer 500 (chosen by seed,
+                              so the same boards fail on every run)
+    Responses carry an ETag and honour If-None-Match; bump() changes every board's
+    content so the next refresh has real work again.
+    """
+
+    def __init__(
+        self,
+        jobs_per_board: int = 50,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.jobs_per_board = jobs_per_board
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.generation = 0
+        self.requests = 0
+        self._bodies: Dict[Tuple[str, str, int], Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fails(self, token: str) -> bool:
+        return random.Random(f"{self.seed}:fail:{token}").random() < self.failure_rate
+
+    def bump(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._bodies.clear()
+
+    def _body(self, source: str, token: str) -> Tuple[bytes, str]:
+        key = (source, token, self.generation)
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is None:
+            build = greenhouse_payload if source == "greenhouse" else lever_payload
+            body = json.dumps(build(token, self.jobs_per_board, self.seed, self.generation)).encode()
+            cached = (body, '"%s"' % hashlib.sha1(body).hexdigest()[:16])
+            with self._lock:
+                self._bodies[key] = cached
+        return cached
+
+    def _handler(self):
+        boards = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict] = None):
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                with boards._lock:
+                    boards.requests += 1
+                delay = boards.latency_ms + random.uniform(-1, 1) * boards.jitter_ms
+                if delay > 0:
+                    time.sleep(delay / 1000.0)
+
+                m = _GREENHOUSE_RE.match(self.path)
+                source = "greenhouse" if m else "lever"
+                m = m or _LEVER_RE.match(self.path)
+                if not m:
+                    return self._send(404)
+                token = m.group(1)
+                if boards.fails(token):
+                    return self._send(500, b'{"error": "injected failure"}')
+
+                body, etag = boards._body(source, token)
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, headers={"ETag": etag})
+                self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+        return Handler
+
+    def start(self) -> "FakeBoards":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-boards", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeBoards":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
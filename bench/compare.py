@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python -m bench.compare bench/results/<base>.json bench/results/<new>.json [--threshold 0.2]
+
+A metric regresses when the new value is more than `threshold` (relative) and
+`min-delta` (absolute) worse than the base. Exits 1 if anything regressed.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+# metric -> absolute noise floor below which a change is ignored
+METRICS = {
+    "seconds": 0.005,
+    "p50_ms": 2.0,
+    "p95_ms": 2.0,
+    "peak_rss_mb": 8.0,
+}
+
+
+def load(path: str) -> Tuple[Dict, Dict[Tuple[str, int], Dict]]:
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("meta", {}), {(r["scenario"], r["size"]): r for r in data["results"]}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("base")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts (0.2 = 20%%)")
+    ap.add_argument("--min-delta", type=float, default=1.0, help="scale for the absolute noise floors")
+    args = ap.parse_args(argv)
+
+    base_meta, base = load(args.base)
+    new_meta, new = load(args.new)
+    print(f"base {base_meta.get('commit')}  vs  new {new_meta.get('commit')}")
+    print(f"{'scenario':<24}{'size':>8}  {'metric':<12}{'base':>12}{'new':>12}{'change':>9}")
+
+    regressions = 0
+    for key in sorted(base.keys() & new.keys(), key=lambda k: (k[1], k[0])):
+        for metric, floor in METRICS.items():
+            b, n = base[key].get(metric), new[key].get(metric)
+            if b is None or n is None:
+                continue
+            change = (n - b) / b if b else 0.0
+            bad = change > args.threshold and (n - b) > floor * args.min_delta
+            regressions += bad
+            print(f"{key[0]:<24}{key[1]:>8}  {metric:<12}{b:>12.3f}{n:>12.3f}{change:>+8.0%}"
+                  f"{'  REGRESSION' if bad else ''}")
+
+    for key in sorted(base.keys() ^ new.keys()):
+        print(f"{key[0]:<24}{key[1]:>8}  only in {'base' if key in base else 'new'}")
+
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Deterministic synthetic data for the benchmarks: a profile, job postings,
+CSV exports and Greenhouse/Lever board payloads. The same seed always
+produces the same corpus, so results are comparable between commits.
+"""
+import csv
+import random
+from typing import Dict, Iterator, List
+
+SKILLS = [
+    "python", "sql", "spark", "pyspark", "databricks", "snowflake", "airflow", "dbt",
+    "kafka", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "scala", "java",
+    "fastapi", "sqlalchemy", "postgresql", "redis", "elasticsearch", "tableau", "power bi",
+    "hadoop", "delta lake", "git", "linux", "react", "typescript", "golang", "pandas",
+    "numpy", "machine learning", "etl", "data modeling", "ci/cd", "graphql", "rest api",
+]
+
+FILLER = (
+    "we are looking for an engineer to join our team and help build reliable systems "
+    "you will work closely with product and analytics partners to design deliver and "
+    "operate services at scale ownership collaboration and clear communication matter "
+    "experience with distributed systems testing and monitoring is a plus benefits "
+    "include remote work flexible hours learning budget and a friendly culture"
+).split()
+
+TITLES = [
+    "Data Engineer", "Senior Data Engineer", "Analytics Engineer", "Backend Engineer",
+    "Platform Engineer", "Machine Learning Engineer", "Software Engineer", "Data Architect",
+]
+LOCATIONS = ["Remote", "New York, NY", "Austin, TX", "Seattle, WA", "London", "Toronto", "Berlin"]
+SOURCES = ["linkedin", "indeed", "dice", "company"]
+
+CSV_COLUMNS = ["source", "company", "title", "location", "url", "description"]
+
+
+def make_profile(seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, 15)
+    bullets = [
+        f"Built {rng.choice(['batch', 'streaming', 'real-time'])} pipelines with "
+        f"{rng.choice(skills)} and {rng.choice(skills)} processing {rng.randint(1, 500)}M rows a day"
+        for _ in range(8)
+    ]
+    return {
+        "full_name": "Bench Candidate",
+        "email": "bench@example.com",
+        "phone": "555-0100",
+        "location": "Remote",
+        "linkedin": "https://linkedin.com/in/bench",
+        "summary": "Data engineer focused on reliable pipelines.",
+        "skills": skills,
+        "truth_bullets": bullets,
+    }
+
+
+def make_description(rng: random.Random, words: int = 120) -> str:
+    out = []
+    for _ in range(words):
+        # roughly one word in eight is a skill, like a real posting's requirements list
+        out.append(rng.choice(SKILLS) if rng.random() < 0.125 else rng.choice(FILLER))
+    return " ".join(out)
+
+
+def iter_jobs(n: int, seed: int = 0, prefix: str = "job") -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "source": rng.choice(SOURCES),
+            "company": f"Company {rng.randint(1, max(1, n // 20))}",
+            "title": rng.choice(TITLES),
+            "location": rng.choice(LOCATIONS),
+            "url": f"https://jobs.example.com/{prefix}/{i}",
+            "description": make_description(rng, rng.randint(60, 250)),
+        }
+
+
+def write_jobs_csv(path: str, n: int, seed: int = 0) -> int:
+    """Stream `n` postings to a CSV export; returns the file size in bytes."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        w.writeheader()
+        for job in iter_jobs(n, seed):
+            w.writerow(job)
+        return f.tell()
+
+
+def greenhouse_payload(token: str, n: int, seed: int = 0, generation: int = 0) -> Dict:
+    rng = random.Random(f"{seed}:{token}:{generation}")
+    return {"jobs": [
+        {
+            "title": rng.choice(TITLES),
+            "absolute_url": f"https://boards.greenhouse.io/{token}/jobs/{i}",
+            "location": {"name": rng.choice(LOCATIONS)},
+            "departments": [{"name": "Engineering"}],
+            "content": "&lt;p&gt;" + make_description(rng) + "&lt;/p&gt;",
+        }
+        for i in range(n)
+    ]}
+
+
+def lever_payload(token: str, n: int, seed: int = 0, generation: int = 0) -> List[Dict]:
+    rng = random.Random(f"{seed}:{token}:{generation}")
+    return [
+        {
+            "text": rng.choice(TITLES),
+            "hostedUrl": f"https://jobs.lever.co/{token}/{i}",
+            "categories": {"location": rng.choice(LOCATIONS), "team": "Engineering"},
+            "descriptionPlain": make_description(rng),
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,266 @@
+"""
+Benchmark the API end to end against a synthetic corpus.
+
+    python -m bench.run --sizes 1000,10000,100000
+    python -m bench.compare bench/results/<old>.json bench/results/<new>.json
+
+Each corpus size runs in its own process with a fresh database, so sizes don't
+share caches and peak memory is per size. Results are written as JSON (one
+record per scenario and size) tagged with the git commit they were taken on.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    _PAGE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE = 4096
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux); falls back to the lifetime peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Polls RSS on a background thread and keeps the maximum seen."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.start_rss = self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+class Recorder:
+    def __init__(self, size: int):
+        self.size = size
+        self.results: List[Dict] = []
+
+    @contextmanager
+    def measure(self, scenario: str, items: int = 1):
+        """
+        Time the block. The block may yield per-call latencies by appending to the
+        list it receives (for repeated calls); otherwise the whole block is one call.
+        """
+        latencies: List[float] = []
+        with RssSampler() as mem:
+            t0 = time.perf_counter()
+            yield latencies
+            seconds = time.perf_counter() - t0
+        if not latencies:
+            latencies = [seconds]
+        rec = {
+            "scenario": scenario,
+            "size": self.size,
+            "items": items,
+            "seconds": round(seconds, 4),
+            "throughput": round(items / seconds, 1) if seconds > 0 else None,
+            "p50_ms": round(_pct(latencies, 50) * 1000, 2),
+            "p95_ms": round(_pct(latencies, 95) * 1000, 2),
+            "peak_rss_mb": round(mem.peak / 2**20, 1),
+            "rss_delta_mb": round((mem.peak - mem.start_rss) / 2**20, 1),
+        }
+        self.results.append(rec)
+        print(f"  {scenario:<22} n={self.size:<8} {rec['seconds']:>9.3f}s "
+              f"p50={rec['p50_ms']:>8.2f}ms p95={rec['p95_ms']:>8.2f}ms "
+              f"peak={rec['peak_rss_mb']:>7.1f}MB", file=sys.stderr, flush=True)
+
+
+def _wait_task(client, task_id: str, poll: float = 0.05) -> Dict:
+    while True:
+        task = client.get(f"/tasks/{task_id}").json()
+        if task["status"] in ("done", "failed"):
+            return task
+        time.sleep(poll)
+
+
+def run_size(size: int, args) -> List[Dict]:
+    """Run every scenario against a fresh database holding `size` imported postings."""
+    from bench.boards import FakeBoards
+    from bench.corpus import make_profile, write_jobs_csv
+
+    work = tempfile.mkdtemp(prefix=f"bench-{size}-")
+    boards = FakeBoards(
+        jobs_per_board=args.jobs_per_board,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    ).start()
+    # must be set before the app (and its settings) is imported
+    os.environ.update({
+        "DB_URL": f"sqlite:///{work}/bench.sqlite3",
+        "PACKETS_DIR": os.path.join(work, "packets"),
+        "TEMPLATES_DIR": args.templates_dir,
+        "SCHEDULER_ENABLED": "false",
+        "GREENHOUSE_API_BASE": boards.base_url,
+        "LEVER_API_BASE": boards.base_url,
+    })
+    rec = Recorder(size)
+    try:
+        csv_path = os.path.join(work, "jobs.csv")
+        write_jobs_csv(csv_path, size, seed=args.seed)
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with TestClient(app) as c:
+            c.post("/profile", json=make_profile(args.seed)).raise_for_status()
+
+            with rec.measure("import_csv", items=size):
+                with open(csv_path, "rb") as f:
+                    c.post("/jobs/import/csv", files={"file": ("jobs.csv", f, "text/csv")}).raise_for_status()
+            with rec.measure("import_csv_unchanged", items=size):
+                with open(csv_path, "rb") as f:
+                    c.post("/jobs/import/csv", files={"file": ("jobs.csv", f, "text/csv")}).raise_for_status()
+
+            for i in range(args.boards):
+                source = "greenhouse" if i % 2 == 0 else "lever"
+                c.post(f"/targets/{source}", json={"company_token": f"board{i}"}).raise_for_status()
+            fetched = args.boards * args.jobs_per_board
+            for scenario in ("refresh_cold", "refresh_not_modified"):
+                with rec.measure(scenario, items=fetched):
+                    task = _wait_task(c, c.post("/jobs/refresh").json()["id"])
+                rec.results[-1]["failed_targets"] = sum(
+                    1 for t in task["targets"] if t["status"] not in ("ok", "not_modified", "unchanged")
+                )
+            boards.bump()
+            with rec.measure("refresh_changed", items=fetched):
+                _wait_task(c, c.post("/jobs/refresh").json()["id"])
+
+            with rec.measure("top_jobs_cold", items=size + fetched):
+                top = c.get("/jobs/top", params={"limit": max(25, args.packets)}).json()
+            with rec.measure("top_jobs_warm", items=args.repeat) as lat:
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    c.get("/jobs/top", params={"limit": 25}).raise_for_status()
+                    lat.append(time.perf_counter() - t0)
+
+            ids = [j["id"] for j in top[: args.packets]]
+            if ids:
+                with rec.measure("generate_packet", items=len(ids)) as lat:
+                    for jid in ids:
+                        t0 = time.perf_counter()
+                        c.post(f"/packets/generate/{jid}").raise_for_status()
+                        lat.append(time.perf_counter() - t0)
+                with rec.measure("generate_packets_batch", items=len(ids)):
+                    c.post("/packets/generate", json={"job_ids": ids}).raise_for_status()
+    finally:
+        boards.stop()
+        shutil.rmtree(work, ignore_errors=True)
+    return rec.results
+
+
+def _git(*cmd: str) -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", *cmd], cwd=REPO, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args) -> Dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if not k.startswith("_")},
+    }
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1000,10000", help="comma-separated corpus sizes (rows)")
+    ap.add_argument("--boards", type=int, default=20, help="fake Greenhouse/Lever boards to refresh")
+    ap.add_argument("--jobs-per-board", type=int, default=50)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="fake board response delay")
+    ap.add_argument("--jitter-ms", type=float, default=20.0)
+    ap.add_argument("--failure-rate", type=float, default=0.05, help="share of boards answering 500")
+    ap.add_argument("--packets", type=int, default=5, help="packets generated per size")
+    ap.add_argument("--repeat", type=int, default=20, help="warm /jobs/top calls per size")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--templates-dir", default=os.path.join(REPO, "data", "templates"))
+    ap.add_argument("--out", default=None, help="results file (default bench/results/<commit>.json)")
+    ap.add_argument("--_child", type=int, default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--_child-out", default=None, help=argparse.SUPPRESS)
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args._child is not None:
+        with open(args._child_out, "w") as f:
+            json.dump(run_size(args._child, args), f)
+        return 0
+
+    results: List[Dict] = []
+    base_argv = list(argv if argv is not None else sys.argv[1:])
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"size {size}", file=sys.stderr, flush=True)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            child_out = tmp.name
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "bench.run", *base_argv,
+                 "--_child", str(size), "--_child-out", child_out],
+                cwd=REPO, check=True,
+            )
+            with open(child_out) as f:
+                results.extend(json.load(f))
+        finally:
+            os.remove(child_out)
+
+    meta = metadata(args)
+    out = args.out or os.path.join(
+        REPO, "bench", "results", f"{meta['commit'] or 'local'}{'-dirty' if meta['dirty'] else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"wrote {out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
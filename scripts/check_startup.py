@@ -0,0 +1,75 @@
+"""
+Import-time budget for app.main, checked in fresh interpreters (what a new
+uvicorn worker or a --reload pays before it can serve):
+
+    python scripts/check_startup.py --budget-ms 1500
+
+Fails if the median import exceeds the budget, if a heavy dependency is loaded
+at import (they belong on first use), or if importing opens a DB connection.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use by the code paths that need them, never by `import app.main`
+LAZY_MODULES = ("numpy", "rapidfuzz", "pypdf", "docx", "lxml", "requests")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t0
+from app.db import engine
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+    "connections": engine.pool.checkedin() + engine.pool.checkedout(),
+}))
+""" % (LAZY_MODULES,)
+
+
+def probe(db_url: str) -> dict:
+    env = {**os.environ, "DB_URL": db_url, "PYTHONPATH": ROOT, "PYTHONDONTWRITEBYTECODE": "1"}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    ap.add_argument("--budget-ms", type=float, default=1500, help="max median import time (default 1500)")
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters to time (default 5)")
+    args = ap.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "startup.sqlite3")
+        results = [probe(f"sqlite:///{db_path}") for _ in range(max(1, args.runs))]
+        if os.path.exists(db_path):
+            failures.append("importing app.main created the database file (run migrations in the lifespan)")
+
+    median = statistics.median(r["ms"] for r in results)
+    print(f"import app.main: median {median:.0f} ms over {len(results)} runs (budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        failures.append(f"import time {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    if loaded:
+        failures.append("loaded at import: " + ", ".join(loaded) + " (import them where they are used)")
+    if any(r["connections"] for r in results):
+        failures.append("importing app.main opened a DB connection")
+
+    for f in failures:
+        print(f"FAIL: {f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+from app.db import SessionLocal, engine
+from app.migrations import run_migrations
+from app import models
+from app.dedupe import index_jobs
+
+# Jobs per index_jobs call / commit
+CHUNK = 2000
+
+def main():
+    """Sign and cluster jobs ingested before near-duplicate detection existed."""
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        last_id, done, clustered = 0, 0, 0
+        while True:
+            ids = [
+                i for (i,) in db.query(models.Job.id)
+                .filter(models.Job.minhash.is_(None), models.Job.id > last_id)
+                .order_by(models.Job.id)
+                .limit(CHUNK)
+            ]
+            if not ids:
+                break
+            clustered += index_jobs(db, ids)
+            db.commit()
+            done += len(ids)
+            last_id = ids[-1]
+        print(f"Indexed {done} jobs, {clustered} in near-duplicate clusters.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
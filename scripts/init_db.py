@@ -1,9 +1,9 @@
-from app.db import Base, engine
-from app import models  # noqa: F401
+from app.db import engine
+from app.migrations import run_migrations
 
 def main():
-    Base.metadata.create_all(bind=engine)
-    print("DB initialized.")
+    applied = run_migrations(engine)
+    print("DB initialized." + (f" Applied: {', '.join(applied)}" if applied else ""))
 
 if __name__ == "__main__":
     main()
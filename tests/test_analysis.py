@@ -0,0 +1,132 @@
+"""
+JobAnalysis (app/analysis.py): the shared per-job analysis must score exactly
+like the normalized text it replaces, and its cache must never serve an
+analysis built for a different description or vocabulary.
+"""
+import random
+
+import pytest
+
+from app import analysis
+from app.analysis import JobAnalysis, analyze_text, get_analysis
+from app.scoring import bullet_similarity_matrix, score_matrix
+from app.utils import content_hash, extract_keywords, normalize_skill, normalize_text
+
+TRICKY = [
+    "",
+    "python",
+    "Python  python PYTHON\tpython\n\nsql sql",
+    "C++ / C# engineers, 5+ yrs; e.g. Node.js & Vue.js -- on-call (24/7)",
+    "Émigré naïve café résumé — data   engineer with spark",
+    "kafka, kafka; kafka: the the the and and streaming streaming",
+]
+
+
+SKILLS = ["Python", "SQL", "Kafka", "Airflow", "Spark", "AWS", "dbt", "Docker", "Kubernetes", "Java"]
+FILLER = (
+    "we are looking for an engineer to build and run reliable data pipelines with the team "
+    "experience in production systems is a plus you will own batch and streaming jobs"
+).split()
+
+PROFILES = [
+    (
+        ["python", "sql", "airflow", "docker"],
+        ["Built Airflow pipelines in Python processing 40M rows a day",
+         "Tuned SQL warehouses and cut query cost by half",
+         "python, sql; c++ 5+ yrs"],
+    ),
+    (
+        ["java", "kafka", "spark", "aws"],
+        ["Ran Kafka and Spark streaming jobs on AWS",
+         "Streaming Kafka pipelines",
+         "Migrated Java services to Kubernetes"],
+    ),
+]
+
+
+def _description(rng: random.Random, words: int) -> str:
+    """Filler text with skills mixed in, repeated words and punctuation included."""
+    out = []
+    for _ in range(words):
+        w = rng.choice(SKILLS) if rng.random() < 0.2 else rng.choice(FILLER)
+        out.append(w + rng.choice(["", "", "", ",", ".", ";"]))
+    return " ".join(out)
+
+
+def _jds():
+    rng = random.Random(7)
+    return TRICKY + [_description(rng, rng.choice([20, 120, 400])) for _ in range(200)]
+
+
+def _profiles():
+    return PROFILES
+
+
+def _reference_scores(skills, bullets, jd_texts):
+    """score_job's formula as it was before JobAnalysis: fuzzy match on the full normalized text."""
+    jds = [normalize_text(t).lower() for t in jd_texts]
+    sims = bullet_similarity_matrix(bullets, jds, workers=1)
+    prof_set = {normalize_skill(s) for s in skills if s.strip()}
+    out = []
+    for i, jd in enumerate(jds):
+        kws = extract_keywords(jd)
+        matched = [k for k in kws if k in prof_set]
+        missing = [k for k in kws if k not in prof_set]
+        keyword_score = len(matched) / len(kws) * 70.0 if kws else 0.0
+        bullet_score = float(sims[:, i].max()) / 100.0 * 30.0 if bullets else 0.0
+        out.append((round(keyword_score + bullet_score, 2), matched, missing))
+    return out
+
+
+def test_fuzzy_text_scores_like_normalized_text():
+    jds = [analyze_text(t) for t in _jds()]
+    bullets = [b for _, bs in _profiles() for b in bs]
+    full = bullet_similarity_matrix(bullets, [a.normalized_text for a in jds], workers=1)
+    short = bullet_similarity_matrix(bullets, [a.fuzzy_text for a in jds], workers=1)
+    assert (full == short).all()
+
+
+def test_score_matrix_matches_reference():
+    texts = _jds()
+    profiles = _profiles()
+    got = score_matrix(profiles, [analyze_text(t) for t in texts], workers=1)
+    for (skills, bullets), results in zip(profiles, got):
+        assert results == _reference_scores(skills, bullets, texts)
+
+
+def test_cache_reuses_same_job_and_content():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return "data engineer python", ["python"]
+
+    a = get_analysis(101, content_hash("Data engineer Python"), build)
+    b = get_analysis(101, content_hash("Data engineer Python"), build)
+    assert a is b
+    assert len(calls) == 1
+
+
+def test_cache_misses_on_changed_description_or_vocabulary(monkeypatch):
+    a = get_analysis(102, content_hash("old"), lambda: ("old", []))
+    b = get_analysis(102, content_hash("new"), lambda: ("new", []))
+    assert (a.normalized_text, b.normalized_text) == ("old", "new")
+
+    monkeypatch.setattr(analysis, "vocab_version", lambda: "other-vocab")
+    c = get_analysis(102, content_hash("new"), lambda: ("rebuilt", []))
+    assert c.normalized_text == "rebuilt"
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(analysis.settings, "analysis_cache_size", 2)
+    for i in range(5):
+        get_analysis(200 + i, content_hash(str(i)), lambda: ("x", []))
+    assert len(analysis._cache) == 2
+
+
+@pytest.mark.parametrize("text", TRICKY)
+def test_analyze_text_accepts_analysis(text):
+    a = analyze_text(text)
+    assert isinstance(a, JobAnalysis)
+    assert analyze_text(a) is a
+    assert a.keyword_set == frozenset(a.keywords)
@@ -0,0 +1,39 @@
+"""
+Keyword extraction (app/keywords.py): whole-token, alias-aware matching where
+a compound alias ("aws s3", "spark sql") never hides the skills it names.
+"""
+import os
+
+import pytest
+
+from app.keywords import KeywordMatcher, load_vocab
+
+VOCAB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "vocab", "skills.txt")
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return KeywordMatcher(load_vocab(VOCAB))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("AWS S3 and Azure Databricks, Spark SQL, Azure Blob Storage",
+     ["aws", "s3", "azure", "databricks", "spark", "sql", "blob storage"]),
+    ("Amazon S3 buckets", ["s3"]),
+    ("Azure SQL Database", ["azure", "azure sql", "sql"]),
+    ("Terraform on AWS EC2", ["terraform", "aws", "ec2"]),
+])
+def test_compound_aliases_keep_their_parts(matcher, text, expected):
+    assert matcher.extract(text) == expected
+
+
+def test_matches_are_whole_tokens_and_deduplicated(matcher):
+    assert matcher.extract("digital transformation") == []
+    assert matcher.extract("PowerBI, power-bi and Power BI") == ["power bi"]
+    assert matcher.extract("C++ and Node.js; more c++") == ["c++", "node.js"]
+
+
+def test_canonical_maps_aliases(matcher):
+    assert matcher.canonical("Amazon Web Services") == "aws"
+    assert matcher.canonical("Spark SQL") == "spark"
+    assert matcher.canonical("not a skill") == "not a skill"
@@ -0,0 +1,115 @@
+"""
+Packet cache keys (app/packets.py): every input that shapes a packet must
+produce a new version folder when it changes, and nothing else may.
+"""
+import os
+
+import pytest
+from docx import Document
+
+from app.analysis import analyze_description, split_keywords
+from app.packets import build_packet
+from app.templating import load_template
+
+DESCRIPTION = "We need a data engineer with Python, SQL, Airflow and Kafka experience."
+
+
+def _write_resume(path: str, name_placeholder: str = "{{FULL_NAME}}") -> None:
+    doc = Document()
+    doc.add_paragraph(name_placeholder)
+    doc.add_paragraph("{{EMAIL}} | {{PHONE}}")
+    doc.save(path)
+
+
+def _touch_later(path: str) -> None:
+    # the file caches key on (mtime, size); make sure a rewrite is always seen
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def env(tmp_path):
+    base = str(tmp_path / "resume_base.docx")
+    _write_resume(base)
+    cover = tmp_path / "cover_letter.md"
+    cover.write_text("Dear {{HIRING_TEAM}}, I'm applying for {{JOB_TITLE}} at {{COMPANY}}.\n", encoding="utf-8")
+    recruiter = tmp_path / "recruiter_message.txt"
+    recruiter.write_text("Hi, {{FULL_NAME}} here about {{JOB_TITLE}}.\n", encoding="utf-8")
+
+    a = analyze_description(DESCRIPTION)
+    prof = {
+        "id": 1, "full_name": "Ada Lovelace", "email": "ada@example.com", "phone": "555-0100",
+        "location": "Remote", "linkedin": "", "summary": "Data engineer.",
+        "skills": ["python", "sql", "airflow"],
+        "truth_bullets": ["Built Airflow pipelines in Python", "Tuned SQL warehouses"],
+    }
+    job = {
+        "id": 7, "source": "greenhouse", "company": "Acme", "title": "Data Engineer",
+        "location": "Remote", "url": "https://example.com/jobs/7", "description": DESCRIPTION,
+        "normalized_text": a["normalized_text"], "keywords": split_keywords(a["keywords_csv"]),
+    }
+
+    def templates():
+        return {
+            "cover_letter": load_template(str(cover)),
+            "recruiter_message": load_template(str(recruiter)),
+        }
+
+    def build(prof=prof, job=job):
+        return build_packet(prof, job, base, templates(), str(tmp_path / "packets"))
+
+    return {"build": build, "prof": prof, "job": job, "base": base, "cover": cover}
+
+
+def _versions(packet: dict) -> list:
+    return sorted(d for d in os.listdir(os.path.dirname(packet["packet_path"])) if not d.startswith("."))
+
+
+def test_unchanged_inputs_are_cached(env):
+    first = env["build"]()
+    again = env["build"]()
+    assert first["cached"] is False
+    assert again["cached"] is True
+    assert again["packet_path"] == first["packet_path"]
+    assert all(os.path.exists(again[k]) for k in ("resume_docx", "cover_letter", "recruiter_message", "match_report"))
+
+
+def test_changed_profile_bullet_builds_new_version(env):
+    first = env["build"]()
+    prof = {**env["prof"], "truth_bullets": env["prof"]["truth_bullets"] + ["Ran Kafka in production"]}
+    second = env["build"](prof=prof)
+    assert second["cached"] is False
+    assert second["packet_path"] != first["packet_path"]
+    assert len(_versions(second)) == 2
+
+
+def test_changed_template_file_builds_new_version(env):
+    first = env["build"]()
+    env["cover"].write_text("Hello {{COMPANY}} team, re: {{JOB_TITLE}}.\n", encoding="utf-8")
+    _touch_later(str(env["cover"]))
+    second = env["build"]()
+    assert second["cached"] is False
+    assert second["packet_path"] != first["packet_path"]
+    with open(second["cover_letter"], encoding="utf-8") as f:
+        assert f.read() == "Hello Acme team, re: Data Engineer.\n"
+
+
+def test_changed_base_resume_builds_new_version(env):
+    first = env["build"]()
+    _write_resume(env["base"], name_placeholder="Name: {{FULL_NAME}}")
+    _touch_later(env["base"])
+    second = env["build"]()
+    assert second["cached"] is False
+    assert second["packet_path"] != first["packet_path"]
+
+
+def test_changed_job_description_builds_new_version(env):
+    first = env["build"]()
+    a = analyze_description(DESCRIPTION + " Spark is a plus.")
+    job = {
+        **env["job"], "description": DESCRIPTION + " Spark is a plus.",
+        "normalized_text": a["normalized_text"], "keywords": split_keywords(a["keywords_csv"]),
+    }
+    second = env["build"](job=job)
+    assert second["cached"] is False
+    assert second["packet_path"] != first["packet_path"]
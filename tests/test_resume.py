@@ -0,0 +1,63 @@
+"""
+Resume PDF extraction (app/resume.py): broken files surface as ResumeError
+(a 400), and a dead worker pool is replaced instead of failing every upload.
+"""
+import io
+import os
+import signal
+import time
+
+import pytest
+from pypdf import PageObject, PdfWriter
+from pypdf.errors import PdfReadError
+
+from app import resume
+
+
+def _blank_pdf(pages: int) -> bytes:
+    w = PdfWriter()
+    for _ in range(pages):
+        w.add_blank_page(width=612, height=792)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(resume, "_cache", type(resume._cache)())
+    yield
+    resume.shutdown()
+
+
+def test_unreadable_file_is_resume_error():
+    with pytest.raises(resume.ResumeError):
+        resume.extract_pdf_text(b"%PDF-1.4 not really a pdf")
+
+
+def test_page_extraction_error_is_resume_error(monkeypatch):
+    monkeypatch.setattr(resume.settings, "resume_parse_workers", 1)
+
+    def broken(self, *args, **kwargs):
+        raise PdfReadError("bad content stream")
+
+    monkeypatch.setattr(PageObject, "extract_text", broken)
+    with pytest.raises(resume.ResumeError, match="bad content stream"):
+        resume.extract_pdf_text(_blank_pdf(2))
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_broken_pool_falls_back_and_is_replaced(monkeypatch):
+    monkeypatch.setattr(resume.settings, "resume_parse_workers", 2)
+    pool = resume._get_pool()
+    pool.submit(os.getpid).result()  # start the workers
+    for pid in list(pool._processes):
+        os.kill(pid, signal.SIGKILL)
+    # let the executor notice, so the upload below sees a broken pool rather
+    # than racing its teardown (which can hang the interpreter at exit)
+    deadline = time.monotonic() + 10
+    while not pool._broken and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert resume.extract_pdf_text(_blank_pdf(resume.PARALLEL_MIN_PAGES)) == ""
+    assert resume._pool is not pool